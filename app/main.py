@@ -1,54 +1,227 @@
 from __future__ import annotations
 
 import json
-import subprocess
+import logging
+import math
+import mmap
+import os
+import queue
+import string
 import sys
 import threading
+import time
 import tkinter as tk
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from functools import lru_cache, partial
 from pathlib import Path
-from tkinter import filedialog, messagebox, ttk
-from typing import Any, Dict, List, Optional, Tuple
+from tkinter import font as tkfont, messagebox, ttk
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 RESOURCES_DIR = ROOT_DIR / "resources"
+CONFIG_DIR = ROOT_DIR / "config"  # ROOT_DIR ist bereits aufgelöst
 if str(RESOURCES_DIR) not in sys.path:
     sys.path.insert(0, str(RESOURCES_DIR))
 
+# Optionaler schneller JSON-Parser (orjson > ujson > stdlib); alle akzeptieren bytes.
+try:
+    import orjson as _fast_json
+except ImportError:
+    try:
+        import ujson as _fast_json
+    except ImportError:
+        _fast_json = None
+
+json_loads = _fast_json.loads if _fast_json is not None else json.loads
+_HAS_ORJSON = _fast_json is not None and _fast_json.__name__ == "orjson"
+# Nur orjson parst direkt aus einem Buffer (memoryview), ohne vorher bytes zu kopieren
+_JSON_LOADS_BUFFER = _HAS_ORJSON
+MMAP_THRESHOLD = 64 * 1024  # Kleinere Dateien lohnen den mmap-Aufbau nicht
+
+
+def json_dump_bytes(data: Any) -> bytes:
+    """Serialisiert nach UTF-8, mit zwei Leerzeichen eingerückt (Protokoll und Referenz-Datei werden gelesen).
+
+    Das Layout hängt nicht davon ab, ob orjson installiert ist; was orjson ablehnt
+    (z.B. Ganzzahlen über 64 Bit), schreibt der stdlib-Encoder.
+    """
+    if _HAS_ORJSON:
+        try:
+            return _fast_json.dumps(data, option=_fast_json.OPT_INDENT_2 | _fast_json.OPT_NON_STR_KEYS)
+        except _fast_json.JSONEncodeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_file_bytes(path: Path, data: bytes) -> None:
+    """Schreibt `data`; der Zielordner wird nur angelegt, wenn er noch fehlt (spart stat/mkdir pro Speichern)."""
+    try:
+        path.write_bytes(data)
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+def encode_text_file(content: str) -> bytes:
+    """Kodiert Text für write_bytes; Zeilenenden wie bei write_text (unter Windows CRLF)."""
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    return content.encode("utf-8")
+
+# Optionaler Streaming-Parser für sehr große Referenz-Dateien
 try:
-    from get_save_dialog import save_in_word_dialog
+    import ijson
+except ImportError:
+    ijson = None
+
+REFERENCE_STREAM_THRESHOLD = 10 * 1024 * 1024  # Ab dieser Größe Referenz-Dateien streamen
+
+# Protokoll-Formatierung
+PROTOCOL_RULE = "=" * 70
+PROTOCOL_SUBRULE = "-" * 70
+PROTOCOL_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Schriften der Oberfläche: Name → (Größe, Gewicht); werden einmal als benannte Tk-Fonts angelegt
+UI_FONT_FAMILY = "Segoe UI"
+UI_FONTS: Dict[str, Tuple[int, str]] = {
+    "start_title": (24, "bold"),
+    "title": (22, "bold"),
+    "total_timer": (32, "bold"),
+    "step_title": (18, "normal"),
+    "step_timer": (28, "bold"),
+    "attempt_header": (10, "bold"),
+    "reminder_icon": (32, "normal"),
+    "reminder_title": (18, "bold"),
+    "reminder_text": (12, "normal"),
+    "hint": (9, "normal"),
+}
+
+try:
+    from get_save_dialog import ensure_config as ensure_save_dialog_config, save_in_word_dialog
 except Exception:
     print("Warnung: OTBioLab Interceptor konnte nicht geladen werden.")
+    ensure_save_dialog_config = None
     save_in_word_dialog = None
 
 
-@dataclass
+# (Literal, Feldname, Format-Spec, Konversion) wie von string.Formatter().parse geliefert
+TemplateParts = Tuple[Tuple[str, Optional[str], str, Optional[str]], ...]
+
+
+def compile_template(template: Optional[str]) -> Optional[TemplateParts]:
+    """Parst ein Dateinamen-Template einmalig; None, wenn nur str.format es korrekt auswerten kann."""
+    if not template:
+        return None
+    try:
+        parts = tuple(string.Formatter().parse(template))
+    except ValueError:
+        return None  # Fehler erst beim Auslösen melden, wie bisher
+    for _literal, name, spec, _conversion in parts:
+        # Attribut-/Index-Zugriffe und verschachtelte Specs bleiben str.format überlassen
+        if name is not None and (not name.isidentifier() or "{" in spec):
+            return None
+    return parts
+
+
+def render_template(template: str, parts: Optional[TemplateParts], context: Dict[str, Any]) -> str:
+    """Entspricht template.format(**context), nutzt aber die vorgeparsten Teile."""
+    if parts is None:
+        return template.format(**context)
+    out = []
+    add = out.append
+    for literal, name, spec, conversion in parts:
+        if literal:
+            add(literal)
+        if name is None:
+            continue
+        value = context[name]
+        if conversion:
+            value = repr(value) if conversion == "r" else ascii(value) if conversion == "a" else str(value)
+        add(format(value, spec))
+    return "".join(out)
+
+
+# Typumwandlung nicht-leerer Eingaben; liefern (Wert, gültig). Auswahl einmal beim Laden je Feldtyp.
+def _coerce_str(value: str) -> Tuple[Any, bool]:
+    return value, True
+
+
+def _coerce_int(value: str) -> Tuple[Any, bool]:
+    try:
+        return int(value), True
+    except ValueError:
+        return value, False
+
+
+def _coerce_float(value: str) -> Tuple[Any, bool]:
+    try:
+        number = float(value.replace(",", ".") if "," in value else value)
+    except ValueError:
+        return value, False
+    # NaN/inf sind keine Messwerte und hätten in JSON keine verlustfreie Darstellung
+    return (number, True) if math.isfinite(number) else (value, False)
+
+
+VALUE_COERCERS: Dict[str, Callable[[str], Tuple[Any, bool]]] = {
+    "integer": _coerce_int,
+    "float": _coerce_float,
+}
+
+
+@dataclass(frozen=True, slots=True)
 class FieldConfig:
     field_id: str
     label: str
     kind: str = "string"
     required: bool = False
     placeholder: Optional[str] = None
-    options: List[str] = field(default_factory=list)
+    options: Tuple[str, ...] = ()
     use_from_ref: bool = False  # Wert aus Referenz-File übernehmen?
     otbiolab_template: Optional[str] = None  # Dateinamen-Template für dieses Feld
+    otbiolab_template_parts: Optional[TemplateParts] = None  # Vorgeparstes Template (siehe compile_template)
     repeated_measurement: bool = False  # Kann diese Messung wiederholt werden?
-    repeated_fields: List['FieldConfig'] = field(default_factory=list)  # Sub-Felder für jede Wiederholung
+    repeated_fields: Tuple['FieldConfig', ...] = ()  # Sub-Felder für jede Wiederholung
+    # Aus field_id/label/kind abgeleitet (__post_init__), daher keine Konstruktor-Argumente
+    display_label: str = field(init=False)  # Label mit abschließendem ":" für die Formularzeile
+    is_date_auto: bool = field(init=False)  # "Mess-Tag"-Feld: wird beim Formularaufbau mit dem heutigen Datum vorbelegt
+    coerce: Callable[[str], Tuple[Any, bool]] = field(init=False, compare=False, repr=False)  # siehe VALUE_COERCERS
+
+    def __post_init__(self) -> None:
+        label = self.label
+        # frozen: abgeleitete Felder einmalig über object.__setattr__ setzen
+        object.__setattr__(self, "display_label", label if label.endswith(":") else label + ":")
+        # "Mess-Tag" erkennen (field_id ODER label enthält "mess" und "tag") – einmal statt pro Formularaufbau
+        field_lower = self.field_id.lower()
+        label_lower = label.lower()
+        object.__setattr__(
+            self,
+            "is_date_auto",
+            ("mess" in field_lower and "tag" in field_lower) or ("mess" in label_lower and "tag" in label_lower),
+        )
+        object.__setattr__(self, "coerce", VALUE_COERCERS.get(self.kind, _coerce_str))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StepConfig:
     step_id: str
     title: str
     description: str = ""
     expected_duration_seconds: Optional[int] = None
-    fields: List[FieldConfig] = field(default_factory=list)
+    fields: Tuple[FieldConfig, ...] = ()
     otbiolab_template: Optional[str] = None
+    otbiolab_template_parts: Optional[TemplateParts] = None
     notes_placeholder: Optional[str] = None
+    ref_field_ids: Tuple[str, ...] = ()  # Feld-IDs mit use_from_ref (beim Laden vorberechnet)
+    # Beim Laden vorberechnete Sichten auf `fields`
+    fields_by_id: Dict[str, FieldConfig] = field(default_factory=dict, compare=False)
+    plain_fields: Tuple[FieldConfig, ...] = ()  # Felder ohne wiederholbare Messung
+    repeated_measurement_fields: Tuple[FieldConfig, ...] = ()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Reminder:
     """Wiederkehrende Erinnerung während der Session."""
     reminder_id: str
@@ -57,21 +230,22 @@ class Reminder:
     start_after_minutes: int = 0  # Wann soll die erste Erinnerung erscheinen
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Declaration:
     title: str
     description: str
-    metadata_fields: List[FieldConfig]
-    steps: List[StepConfig]
-    reminders: List[Reminder] = field(default_factory=list)
+    metadata_fields: Tuple[FieldConfig, ...]
+    steps: Tuple[StepConfig, ...]
+    reminders: Tuple[Reminder, ...] = ()
+    ref_metadata_field_ids: Tuple[str, ...] = ()  # Metadaten-Feld-IDs mit use_from_ref (beim Laden vorberechnet)
 
 
-@dataclass
+@dataclass(slots=True)
 class StepResult:
     config: StepConfig
-    started_at: Optional[datetime]
-    completed_at: Optional[datetime]
-    duration: Optional[timedelta]
+    started_at_ns: Optional[int]  # time.time_ns(); erst beim Protokoll in datetime umgewandelt
+    completed_at_ns: Optional[int]
+    duration_ns: Optional[int]
     values: Dict[str, Any]
     notes: str
     otbiolab_paths: List[str]  # Liste aller übergebenen OTBioLab-Dateien (Schritt-Ebene, legacy)
@@ -79,41 +253,107 @@ class StepResult:
     repeated_measurements: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)  # Feld-ID → Liste von Versuchen (jeder Versuch = Dict von Sub-Feld-Werten)
 
 
+@dataclass(slots=True)
+class StepState:
+    """Arbeitsstand des aktuellen Schritts; wird beim Abschließen als StepResult festgeschrieben."""
+    otbiolab_paths: List[str] = field(default_factory=list)  # Schritt-Ebene (legacy)
+    field_otbiolab_files: Dict[str, List[str]] = field(default_factory=dict)  # Feld-ID → Liste von Dateien
+    repeated_measurements: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)  # Feld-ID → Versuche
+
+    def is_empty(self) -> bool:
+        return not (self.repeated_measurements or self.field_otbiolab_files or self.otbiolab_paths)
+
+    @classmethod
+    def from_result(cls, result: StepResult) -> StepState:
+        """Tiefe Kopie (Listen und Versuchs-Dicts): Änderungen beim erneuten Bearbeiten landen erst
+        mit dem Abschließen im StepResult, nicht schon beim Zurückblättern."""
+        return cls(
+            otbiolab_paths=list(result.otbiolab_paths),
+            field_otbiolab_files={k: list(v) for k, v in result.field_otbiolab_files.items()},
+            repeated_measurements={k: [dict(attempt) for attempt in v] for k, v in result.repeated_measurements.items()},
+        )
+
+
+def _as_str(value: Any) -> str:
+    # JSON-Strings unverändert übernehmen, nur andere Typen konvertieren.
+    # Feld-IDs werden so garantiert zu str – sie sind Schlüssel in metadata_values und im Template-Context.
+    return value if type(value) is str else str(value)
+
+
 def _parse_field_config(field_data: dict) -> FieldConfig:
     """Parse a field config from JSON, including nested repeated_fields."""
-    repeated_fields = []
-    if "repeated_fields" in field_data:
-        repeated_fields = [_parse_field_config(rf) for rf in field_data["repeated_fields"]]
-
+    get = field_data.get
+    field_id = _as_str(field_data["id"])
+    kind = get("type", "string")
+    raw_repeated = get("repeated_fields")
+    required = get("required", False)
+    use_from_ref = get("use_from_ref", False)
+    template = get("otbiolab_filename_template")
+    label = _as_str(get("label", field_id))
+
+    kind = _as_str(kind)
     return FieldConfig(
-        field_id=str(field_data["id"]),
-        label=str(field_data.get("label", field_data["id"])),
-        kind=str(field_data.get("type", "string")),
-        required=bool(field_data.get("required", False)),
-        placeholder=field_data.get("placeholder"),
-        options=list(field_data.get("options", [])),
-        use_from_ref=bool(field_data.get("use_from_ref", False)),
-        otbiolab_template=field_data.get("otbiolab_filename_template"),
-        repeated_measurement=bool(field_data.get("type") == "repeated_measurement"),
-        repeated_fields=repeated_fields,
+        field_id=field_id,
+        label=label,
+        kind=kind,
+        required=required if type(required) is bool else bool(required),
+        placeholder=get("placeholder"),
+        options=tuple(get("options", ())),
+        use_from_ref=use_from_ref if type(use_from_ref) is bool else bool(use_from_ref),
+        otbiolab_template=template,
+        otbiolab_template_parts=compile_template(template),
+        repeated_measurement=kind == "repeated_measurement",
+        repeated_fields=tuple(map(_parse_field_config, raw_repeated)) if raw_repeated else (),
     )
 
 
+def read_json_file(path: Path, size: Optional[int] = None) -> Any:
+    """Liest eine JSON-Datei; größere Dateien werden (mit orjson) per mmap eingelesen."""
+    if _JSON_LOADS_BUFFER:
+        if size is None:
+            size = path.stat().st_size
+        if size >= MMAP_THRESHOLD:
+            with path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    return json_loads(view)
+    return json_loads(path.read_bytes())
+
+
 def load_declaration(path: Path) -> Declaration:
-    data = json.loads(path.read_text(encoding="utf-8"))
-    metadata_fields = [_parse_field_config(item) for item in data.get("metadata_fields", [])]
+    """Lädt eine Deklaration; geparste Dateien werden pro Pfad und Änderungszeit gecacht."""
+    # Dateidialoge liefern absolute Pfade; resolve() (stat je Pfadelement) nur für relative Pfade
+    resolved = path if path.is_absolute() else path.resolve()
+    return _load_declaration_cached(str(resolved), resolved.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=16)
+def _load_declaration_cached(path_str: str, mtime_ns: int) -> Declaration:
+    # mtime_ns ist Teil des Cache-Keys: geänderte Dateien werden neu geparst.
+    # Die Declaration ist unveränderlich (Tupel), damit gecachte Instanzen sicher geteilt werden können.
+    data = read_json_file(Path(path_str))
+    parse_field = _parse_field_config
+    metadata_fields = tuple(map(parse_field, data.get("metadata_fields", ())))
     steps = []
-    for raw_step in data.get("steps", []):
-        step_fields = [_parse_field_config(field) for field in raw_step.get("fields", [])]
-        steps.append(
+    append_step = steps.append
+    for raw_step in data.get("steps", ()):
+        step_get = raw_step.get
+        step_id = _as_str(raw_step["id"])
+        step_fields = tuple(map(parse_field, step_get("fields", ())))
+        step_template = step_get("otbiolab_filename_template")
+        append_step(
             StepConfig(
-                step_id=str(raw_step["id"]),
-                title=str(raw_step.get("title", raw_step["id"])),
-                description=str(raw_step.get("description", "")),
-                expected_duration_seconds=raw_step.get("expected_duration_seconds"),
+                step_id=step_id,
+                title=_as_str(step_get("title", step_id)),
+                description=_as_str(step_get("description", "")),
+                expected_duration_seconds=step_get("expected_duration_seconds"),
                 fields=step_fields,
-                otbiolab_template=raw_step.get("otbiolab_filename_template"),
-                notes_placeholder=raw_step.get("notes_placeholder"),
+                otbiolab_template=step_template,
+                otbiolab_template_parts=compile_template(step_template),
+                notes_placeholder=step_get("notes_placeholder"),
+                ref_field_ids=tuple(f.field_id for f in step_fields if f.use_from_ref),
+                fields_by_id={f.field_id: f for f in step_fields},
+                plain_fields=tuple(f for f in step_fields if not f.repeated_measurement),
+                repeated_measurement_fields=tuple(f for f in step_fields if f.repeated_measurement),
             )
         )
     if not steps:
@@ -135,71 +375,127 @@ def load_declaration(path: Path) -> Declaration:
         title=str(data.get("title", "Versuchsreihe")),
         description=str(data.get("description", "")),
         metadata_fields=metadata_fields,
-        steps=steps,
-        reminders=reminders,
+        steps=tuple(steps),
+        reminders=tuple(reminders),
+        ref_metadata_field_ids=tuple(f.field_id for f in metadata_fields if f.use_from_ref),
     )
 
 
+def load_reference_data(path: Path) -> Dict[str, Any]:
+    """Liest eine Referenz-Datei.
+
+    Dateien über REFERENCE_STREAM_THRESHOLD werden (falls ijson installiert ist) gestreamt;
+    dabei werden nur `metadata` und die `values` je Schritt übernommen.
+    """
+    size = path.stat().st_size
+    if ijson is None or size <= REFERENCE_STREAM_THRESHOLD:
+        return read_json_file(path, size)
+
+    data: Dict[str, Any] = {}
+    with path.open("rb") as fh:
+        metadata = next(ijson.items(fh, "metadata", use_float=True), None)
+        if metadata is not None:
+            data["metadata"] = metadata
+        fh.seek(0)
+        data["steps"] = {
+            step_id: {"values": step.get("values", {})}
+            for step_id, step in ijson.kvitems(fh, "steps", use_float=True)
+        }
+    return data
+
+
+@lru_cache(maxsize=8192)  # deckt > 2 h Sitzungsdauer sekundengenau ab
+def _hours_clock(seconds: int) -> str:
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+@lru_cache(maxsize=4096)
+def _minutes_clock(seconds: int) -> str:
+    minutes, secs = divmod(seconds, 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def attempt_file_name(attempt: Dict[str, str]) -> str:
+    """Dateiname der OTBioLab-Datei eines Versuchs (beim Speichern zwischengespeichert)."""
+    name = attempt.get("otbiolab_file_name")
+    if name is None:
+        name = attempt["otbiolab_file_name"] = Path(attempt["otbiolab_file"]).name
+    return name
+
+
+def ns_to_datetime(value: int) -> datetime:
+    """Wandelt einen time.time_ns()-Zeitstempel in lokale Zeit um (mikrosekundengenau)."""
+    seconds, rest = divmod(value, 1_000_000_000)
+    return datetime.fromtimestamp(seconds) + timedelta(microseconds=rest // 1000)
+
+
 def seconds_to_clock(value: Optional[float]) -> str:
     """Konvertiert Sekunden zu HH:MM:SS Format."""
     if value is None or value < 0:
         return "00:00:00"
-    seconds = int(value)
-    hours, remainder = divmod(seconds, 3600)
-    minutes, secs = divmod(remainder, 60)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    # Auf ganze Sekunden runden, damit der Timer-Tick den Cache trifft
+    return _hours_clock(int(value))
 
 
 def seconds_to_minutes_clock(value: Optional[float]) -> str:
     """Konvertiert Sekunden zu MM:SS Format (Minuten können über 60 gehen)."""
     if value is None or value < 0:
         return "00:00"
-    seconds = int(value)
-    minutes, secs = divmod(seconds, 60)
-    return f"{minutes:02d}:{secs:02d}"
+    return _minutes_clock(int(value))
+
+
+# SHBrowseForFolderW Konstanten
+BIF_NEWDIALOGSTYLE = 0x0040
+BIF_RETURNONLYFSDIRS = 0x0001
+BIF_EDITBOX = 0x0010
+BFFM_INITIALIZED = 1
+BFFM_SETSELECTIONW = 0x0467
+
+
+@lru_cache(maxsize=None)
+def _browse_folder_api() -> Tuple[Any, Any, Any, Any]:
+    """Lädt ctypes erst beim ersten Ordner-Dialog und baut Callback-Typ und BROWSEINFO nur einmal."""
+    import ctypes
+    from ctypes import wintypes
+
+    browse_callback_type = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HWND, ctypes.c_uint, wintypes.LPARAM, wintypes.LPARAM)
+
+    class BROWSEINFO(ctypes.Structure):
+        _fields_ = [
+            ("hwndOwner", wintypes.HWND),
+            ("pidlRoot", ctypes.c_void_p),
+            ("pszDisplayName", wintypes.LPWSTR),
+            ("lpszTitle", wintypes.LPWSTR),
+            ("ulFlags", ctypes.c_uint),
+            ("lpfn", ctypes.c_void_p),
+            ("lParam", ctypes.c_void_p),
+            ("iImage", ctypes.c_int),
+        ]
+
+    return ctypes, wintypes, browse_callback_type, BROWSEINFO
 
 
 def windows_pick_directory(parent: tk.Tk, title: str, initial_dir: Path) -> Optional[Path]:
     try:
-        import ctypes
-        from ctypes import wintypes
+        ctypes, wintypes, BFFCALLBACK, BROWSEINFO = _browse_folder_api()
     except Exception:
         return None
 
     shell32 = ctypes.windll.shell32
     user32 = ctypes.windll.user32
 
-    BIF_NEWDIALOGSTYLE = 0x0040
-    BIF_RETURNONLYFSDIRS = 0x0001
-    BIF_EDITBOX = 0x0010
-
-    BFFM_INITIALIZED = 1
-    BFFM_SETSELECTIONW = 0x0467
-
-    initial_path = initial_dir.resolve()
+    initial_path = initial_dir if initial_dir.is_absolute() else initial_dir.resolve()
     initial_str = str(initial_path)
     initial_buf = ctypes.create_unicode_buffer(initial_str)
 
-    BFFCALLBACK = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HWND, ctypes.c_uint, wintypes.LPARAM, wintypes.LPARAM)
-
     @BFFCALLBACK
     def browse_callback(hwnd, msg, lParam, lpData):
         if msg == BFFM_INITIALIZED and initial_buf.value:
             user32.SendMessageW(hwnd, BFFM_SETSELECTIONW, 1, ctypes.cast(initial_buf, ctypes.c_void_p).value)
         return 0
 
-    class BROWSEINFO(ctypes.Structure):
-        _fields_ = [
-            ("hwndOwner", wintypes.HWND),
-            ("pidlRoot", ctypes.c_void_p),
-            ("pszDisplayName", wintypes.LPWSTR),
-            ("lpszTitle", wintypes.LPWSTR),
-            ("ulFlags", ctypes.c_uint),
-            ("lpfn", ctypes.c_void_p),
-            ("lParam", ctypes.c_void_p),
-            ("iImage", ctypes.c_int),
-        ]
-
     browse_info = BROWSEINFO()
     browse_info.hwndOwner = parent.winfo_id() if parent else None
     browse_info.pidlRoot = None
@@ -224,21 +520,246 @@ def windows_pick_directory(parent: tk.Tk, title: str, initial_dir: Path) -> Opti
     return None
 
 
+# IFileOpenDialog (Vista+) über rohe COM-vtables, ohne pywin32/comtypes
+CLSID_FILE_OPEN_DIALOG = "{DC1C5A9C-E88A-4DDE-A5A1-60F82A20AEF7}"
+IID_IFILE_OPEN_DIALOG = "{D57C7288-D4AD-4768-BE02-9D969532D960}"
+CLSCTX_INPROC_SERVER = 0x1
+COINIT_APARTMENTTHREADED = 0x2
+FOS_PICKFOLDERS = 0x20
+FOS_FORCEFILESYSTEM = 0x40
+SIGDN_FILESYSPATH = -0x7FFA8000  # 0x80058000 als vorzeichenbehafteter int
+HRESULT_CANCELLED = -0x7FF8FB39  # HRESULT_FROM_WIN32(ERROR_CANCELLED) = 0x800704C7
+# vtable-Indizes (IUnknown 0-2, IModalWindow 3, IFileDialog ab 4; IShellItem ab 3)
+_VT_RELEASE = 2
+_VT_SHOW = 3
+_VT_SET_OPTIONS = 9
+_VT_GET_OPTIONS = 10
+_VT_SET_TITLE = 17
+_VT_GET_RESULT = 20
+_VT_GET_DISPLAY_NAME = 5
+
+
+@lru_cache(maxsize=None)
+def _file_dialog_api() -> Tuple[Any, Any, Any, Any, Dict[int, Any]]:
+    """Baut GUIDs und vtable-Prototypen für IFileOpenDialog einmalig (ctypes erst bei Bedarf)."""
+    import ctypes
+    from ctypes import wintypes
+
+    class GUID(ctypes.Structure):
+        _fields_ = [
+            ("Data1", wintypes.DWORD),
+            ("Data2", wintypes.WORD),
+            ("Data3", wintypes.WORD),
+            ("Data4", ctypes.c_ubyte * 8),
+        ]
+
+    ole32 = ctypes.oledll.ole32
+    clsid, iid = GUID(), GUID()
+    ole32.CLSIDFromString(CLSID_FILE_OPEN_DIALOG, ctypes.byref(clsid))
+    ole32.IIDFromString(IID_IFILE_OPEN_DIALOG, ctypes.byref(iid))
+
+    hresult = ctypes.c_long  # Kein ctypes.HRESULT: Abbruch soll als Wert ankommen, nicht als OSError
+    prototypes = {
+        _VT_RELEASE: ctypes.WINFUNCTYPE(ctypes.c_ulong, ctypes.c_void_p),
+        _VT_SHOW: ctypes.WINFUNCTYPE(hresult, ctypes.c_void_p, wintypes.HWND),
+        _VT_SET_OPTIONS: ctypes.WINFUNCTYPE(hresult, ctypes.c_void_p, wintypes.DWORD),
+        _VT_GET_OPTIONS: ctypes.WINFUNCTYPE(hresult, ctypes.c_void_p, ctypes.POINTER(wintypes.DWORD)),
+        _VT_SET_TITLE: ctypes.WINFUNCTYPE(hresult, ctypes.c_void_p, wintypes.LPCWSTR),
+        _VT_GET_RESULT: ctypes.WINFUNCTYPE(hresult, ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p)),
+        # IShellItem::GetDisplayName hat dieselbe Signatur-Form (this, SIGDN, LPWSTR*)
+        _VT_GET_DISPLAY_NAME: ctypes.WINFUNCTYPE(hresult, ctypes.c_void_p, ctypes.c_int, ctypes.POINTER(wintypes.LPWSTR)),
+    }
+    return ctypes, wintypes, clsid, iid, prototypes
+
+
+def _com_call(api: Tuple[Any, Any, Any, Any, Dict[int, Any]], obj: Any, index: int, *args: Any) -> int:
+    ctypes, _wintypes, _clsid, _iid, prototypes = api
+    vtable = ctypes.cast(obj, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p))).contents
+    return prototypes[index](vtable[index])(obj, *args)
+
+
+def windows_pick_folder(parent: Optional[tk.Tk], title: str) -> str:
+    """Zeigt den modernen Ordner-Dialog (IFileOpenDialog) im eigenen Prozess.
+
+    Liefert "" bei Abbruch; wirft OSError, wenn der Dialog nicht verfügbar ist.
+    """
+    api = _file_dialog_api()
+    ctypes, wintypes, clsid, iid, _prototypes = api
+    ole32 = ctypes.windll.ole32
+    ole32.CoInitializeEx(None, COINIT_APARTMENTTHREADED)  # S_FALSE, wenn Tk den Thread schon initialisiert hat
+
+    dialog = ctypes.c_void_p()
+    hr = ole32.CoCreateInstance(ctypes.byref(clsid), None, CLSCTX_INPROC_SERVER, ctypes.byref(iid), ctypes.byref(dialog))
+    if hr < 0 or not dialog:
+        raise OSError(f"IFileOpenDialog nicht verfügbar (HRESULT {hr & 0xFFFFFFFF:#010x})")
+    try:
+        options = wintypes.DWORD()
+        _com_call(api, dialog, _VT_GET_OPTIONS, ctypes.byref(options))
+        _com_call(api, dialog, _VT_SET_OPTIONS, options.value | FOS_PICKFOLDERS | FOS_FORCEFILESYSTEM)
+        _com_call(api, dialog, _VT_SET_TITLE, title)
+        owner = int(parent.wm_frame(), 16) if parent is not None else None
+        hr = _com_call(api, dialog, _VT_SHOW, owner)
+        if hr == HRESULT_CANCELLED:
+            return ""
+        if hr < 0:
+            raise OSError(f"IFileOpenDialog::Show fehlgeschlagen (HRESULT {hr & 0xFFFFFFFF:#010x})")
+
+        item = ctypes.c_void_p()
+        if _com_call(api, dialog, _VT_GET_RESULT, ctypes.byref(item)) < 0 or not item:
+            return ""
+        try:
+            name = wintypes.LPWSTR()
+            if _com_call(api, item, _VT_GET_DISPLAY_NAME, SIGDN_FILESYSPATH, ctypes.byref(name)) < 0:
+                return ""
+            try:
+                return name.value or ""
+            finally:
+                ole32.CoTaskMemFree(name)
+        finally:
+            _com_call(api, item, _VT_RELEASE)
+    finally:
+        _com_call(api, dialog, _VT_RELEASE)
+
+
+class PowerShellFolderDialog:
+    """Ordner-Dialog über einen warm gehaltenen PowerShell-Prozess (nur Windows).
+
+    Der Kaltstart von PowerShell und das Laden von System.Windows.Forms fallen nur beim
+    ersten Aufruf an; weitere Dialoge laufen im selben Prozess.
+    """
+
+    END_MARKER = "<<OTB_DIALOG_END>>"
+    # Nur ASCII über stdin senden (Umlaut als [char]), Ausgabe kommt als UTF-8 zurück
+    INIT_SCRIPT = (
+        "[Console]::OutputEncoding = [System.Text.Encoding]::UTF8; "
+        "Add-Type -AssemblyName System.Windows.Forms; "
+        "function Select-OTBFolder { "
+        "$dialog = New-Object System.Windows.Forms.FolderBrowserDialog; "
+        "$dialog.Description = \"OTBioLab Zielordner ausw$([char]0xE4)hlen\"; "
+        "$dialog.ShowNewFolderButton = $true; "
+        "if ($dialog.ShowDialog() -eq [System.Windows.Forms.DialogResult]::OK) { Write-Output $dialog.SelectedPath } "
+        "}"
+    )
+
+    def __init__(self) -> None:
+        self._process: Optional[Any] = None
+
+    def _ensure_process(self) -> Any:
+        if self._process is not None and self._process.poll() is None:
+            return self._process
+        import subprocess
+
+        self._process = subprocess.Popen(
+            ["powershell", "-NoProfile", "-NoLogo", "-Command", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            creationflags=subprocess.CREATE_NO_WINDOW,
+        )
+        self._process.stdin.write(self.INIT_SCRIPT + "\n")
+        self._process.stdin.flush()
+        return self._process
+
+    def pick(self) -> str:
+        """Zeigt den Dialog und liefert den gewählten Pfad ("" bei Abbruch)."""
+        process = self._ensure_process()
+        process.stdin.write(f"Select-OTBFolder; Write-Output '{self.END_MARKER}'\n")
+        process.stdin.flush()
+        selected = ""
+        while True:
+            line = process.stdout.readline()
+            if not line:
+                self.close()
+                raise RuntimeError("PowerShell-Prozess wurde unerwartet beendet.")
+            line = line.strip()
+            if line == self.END_MARKER:
+                return selected
+            if line:
+                selected = line
+
+    def close(self) -> None:
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process = None
+
+
+class BackgroundWorker:
+    """Ein wiederverwendeter Daemon-Thread, der blockierende Aufgaben der Reihe nach abarbeitet.
+
+    Die OTBioLab-Übergaben pollen bis zu 30 s; statt pro Klick einen Thread zu starten,
+    landen sie in einer Warteschlange. Daemon, damit ein laufender Auftrag das Beenden nicht blockiert.
+    """
+
+    def __init__(self, name: str = "worker"):
+        self._name = name
+        self._queue: "queue.SimpleQueue[Optional[Callable[[], None]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, task: Callable[[], None]) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+        self._queue.put(task)
+
+    def _run(self) -> None:
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            try:
+                task()
+            except Exception:
+                log.exception("Hintergrundaufgabe %r fehlgeschlagen", self._name)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread = None
+
+
+def coerce_value(field_cfg: FieldConfig, value: str) -> Tuple[Any, bool]:
+    """Wandelt eine Eingabe in den Feldtyp um; liefert (Wert, gültig)."""
+    if value == "":
+        return ("", not field_cfg.required)
+    return field_cfg.coerce(value)
+
+
 class FieldControl:
+    __slots__ = ("config", "widget", "variable", "_change_callbacks", "_typed_cache", "_getter")
+
     def __init__(self, config: FieldConfig, widget: tk.Widget, variable: Optional[tk.Variable] = None):
         self.config = config
         self.widget = widget
         self.variable = variable
         self._change_callbacks: List[Any] = []
+        self._typed_cache: Optional[Tuple[str, Any, bool]] = None  # (Rohwert, typisierter Wert, gültig)
+        # Lese-Funktion einmalig nach Widget-Typ wählen statt bei jedem get_value zu prüfen
+        if isinstance(widget, tk.Text):
+            self._getter = lambda: widget.get("1.0", "end-1c").strip()
+        elif isinstance(variable, tk.StringVar):
+            self._getter = lambda: variable.get().strip()  # StringVar.get liefert bereits str
+        elif variable is not None:
+            self._getter = lambda: str(variable.get()).strip()
+        elif hasattr(widget, "get"):
+            self._getter = lambda: str(widget.get()).strip()
+        else:
+            self._getter = lambda: ""
 
     def get_value(self) -> str:
-        if isinstance(self.widget, tk.Text):
-            return self.widget.get("1.0", "end-1c").strip()
-        if self.variable is not None:
-            return str(self.variable.get()).strip()
-        if hasattr(self.widget, "get"):
-            return str(self.widget.get()).strip()
-        return ""
+        return self._getter()
+
+    def get_typed_value(self) -> Tuple[str, Any, bool]:
+        """Liefert (Rohwert, typisierter Wert, gültig); geparst wird nur, wenn sich der Text geändert hat."""
+        raw_value = self._getter()
+        cached = self._typed_cache
+        if cached is not None and cached[0] == raw_value:
+            return cached
+        typed_value, ok = coerce_value(self.config, raw_value)
+        self._typed_cache = (raw_value, typed_value, ok)
+        return self._typed_cache
 
     def set_value(self, value: Any) -> None:
         if isinstance(self.widget, tk.Text):
@@ -254,6 +775,16 @@ class FieldControl:
             if value:
                 self.widget.insert(0, str(value))
 
+    def reset(self, config: FieldConfig) -> None:
+        """Bindet das Control an eine neue Feldkonfiguration und setzt den Startwert."""
+        self.config = config
+        self._typed_cache = None
+        if isinstance(self.widget, ttk.Combobox):
+            self.widget.configure(values=config.options)
+            self.set_value(config.options[0] if config.options else "")
+            return
+        self.set_value("")
+
     def bind_on_change(self, callback: Any) -> None:
         if isinstance(self.widget, tk.Text):
             def _on_change(event: tk.Event) -> None:
@@ -269,30 +800,178 @@ class FieldControl:
             self.widget.bind("<<ComboboxSelected>>", lambda *_: callback())
 
 
+def control_kind(config: FieldConfig) -> str:
+    """Widget-Art eines Feldes; Zeilen gleicher Art sind untereinander austauschbar."""
+    kind = config.kind.lower()
+    if kind in ("multiline", "choice"):
+        return kind
+    return "entry"
+
+
+class FieldRow:
+    """Formularzeile (Label + Control + optionale OTBioLab-Buttons), die wiederverwendet wird."""
+
+    __slots__ = ("kind", "label", "control", "button_frame", "save_button", "copy_button", "count_label")
+
+    def __init__(self, kind: str, label: ttk.Label, control: FieldControl):
+        self.kind = kind
+        self.label = label
+        self.control = control
+        self.button_frame: Optional[ttk.Frame] = None
+        self.save_button: Optional[ttk.Button] = None
+        self.copy_button: Optional[ttk.Button] = None
+        self.count_label: Optional[ttk.Label] = None
+
+    def widgets(self) -> List[tk.Widget]:
+        return [w for w in (self.label, self.control.widget, self.button_frame, self.count_label) if w is not None]
+
+    def hide(self) -> None:
+        for widget in self.widgets():
+            widget.grid_remove()
+
+
+class FieldRowPool:
+    """Hält die Formularzeilen eines Containers vor, statt sie bei jedem Aufbau zu zerstören.
+
+    `release_all` blendet alle Zeilen aus (grid_remove), `acquire` holt eine freie Zeile
+    passender Widget-Art zurück oder legt eine neue an. `on_change` wird mit dem geänderten
+    FieldControl aufgerufen (dessen `config` zeigt auf das aktuell gebundene Feld).
+
+    Mit `keep_values=True` bekommt ein Feld, das `release_all` in `upcoming` angekündigt
+    wurde, wieder seine eigene Zeile (gleiche ID und Widget-Art) samt eingegebenem Wert
+    zurück; diese Zeilen werden vorher keinem anderen Feld gegeben.
+    """
+
+    def __init__(self, parent: tk.Widget, create_control: Any, on_change: Any = None, keep_values: bool = False):
+        self.parent = parent
+        self._create_control = create_control
+        self._on_change = on_change
+        self._keep_values = keep_values
+        self._free: Dict[str, List[FieldRow]] = {}
+        self._released_by_id: Dict[str, FieldRow] = {}
+        self.rows: List[FieldRow] = []
+
+    def release_all(self, upcoming: Iterable[FieldConfig] = ()) -> None:
+        for row in self.rows:
+            row.hide()
+            self._free.setdefault(row.kind, []).append(row)
+        self._released_by_id = {}
+        if self._keep_values:
+            previous = {row.control.config.field_id: row for row in self.rows}
+            for config in upcoming:
+                row = previous.get(config.field_id)
+                if row is not None and row.kind == control_kind(config):
+                    self._released_by_id[config.field_id] = row
+        self.rows = []
+
+    def acquire(self, config: FieldConfig) -> FieldRow:
+        kind = control_kind(config)
+        row = self._take_previous_row(config, kind)
+        if row is None:
+            row = self._take_free_row(kind)
+            if row is not None:
+                row.control.reset(config)
+                self._lift(row)
+            else:
+                control = self._create_control(self.parent, config)
+                if self._on_change is not None:
+                    on_change = self._on_change
+                    control.bind_on_change(lambda: on_change(control))
+                row = FieldRow(kind, ttk.Label(self.parent), control)
+        row.label.configure(text=config.display_label)
+        self.rows.append(row)
+        return row
+
+    def _take_previous_row(self, config: FieldConfig, kind: str) -> Optional[FieldRow]:
+        row = self._released_by_id.pop(config.field_id, None)
+        if row is None:
+            return None
+        free = self._free[kind]
+        if row not in free:
+            return None
+        free.remove(row)
+        if row.control.config != config:
+            # Geänderte Konfiguration: Wert übernehmen, sofern er weiterhin gültig ist
+            value = row.control.get_value()
+            row.control.reset(config)
+            if value and (kind != "choice" or value in config.options):
+                row.control.set_value(value)
+        self._lift(row)
+        return row
+
+    def _take_free_row(self, kind: str) -> Optional[FieldRow]:
+        """Freie Zeile für ein anderes Feld; für ihr eigenes Feld vorgemerkte Zeilen bleiben liegen."""
+        free = self._free.get(kind)
+        if not free:
+            return None
+        reserved = self._released_by_id
+        for index in range(len(free) - 1, -1, -1):
+            if reserved.get(free[index].control.config.field_id) is not free[index]:
+                return free.pop(index)
+        return None
+
+    @staticmethod
+    def _lift(row: FieldRow) -> None:
+        # Stapelreihenfolge = Tab-Reihenfolge; wiederverwendete Zeilen nach oben holen
+        for widget in row.widgets():
+            widget.lift()
+
+
 class SessionApp(tk.Tk):
     def __init__(self) -> None:
         super().__init__()
         self.title("HDsEMG Versuchsreihe Assistent")
         self.geometry("1200x800")
         self.minsize(960, 640)
+        # Benannte Fonts: Tk hält jede Schrift einmal, alle Widgets referenzieren sie
+        self.fonts: Dict[str, tkfont.Font] = {
+            name: tkfont.Font(self, family=UI_FONT_FAMILY, size=size, weight=weight)
+            for name, (size, weight) in UI_FONTS.items()
+        }
 
         self.declaration: Optional[Declaration] = None
         self.declaration_path: Optional[Path] = None
         self.output_dir: Optional[Path] = None
         self.metadata_controls: Dict[str, FieldControl] = {}
+        # Nur str-Schlüssel (Feld-IDs laufen durch _as_str), damit dict-Lookups auf dem Unicode-Schnellpfad bleiben
         self.metadata_values: Dict[str, Any] = {}
+        # Template-Context aus Metadaten und Schrittangaben, je Schritt einmal aufgebaut (lazy)
+        self._step_context_base: Optional[Tuple[StepConfig, Dict[str, Any]]] = None
+        self._required_unfilled: Set[str] = set()  # IDs leerer Pflicht-Metadatenfelder
+        self._pending_validate_id: Optional[str] = None  # Entprelltes Update des Start-Buttons
         self.step_controls: Dict[str, FieldControl] = {}
-        self.step_results: List[StepResult] = []
+        # Feld-ID → pro Versuch (Index = Versuchsnummer - 1): Sub-Feld-ID → Control
+        self.attempt_controls: Dict[str, List[Dict[str, FieldControl]]] = {}
+        # Seit dem letzten Sichern geänderte Versuchs-Controls: (Feld-ID, Versuchsindex, Sub-Feld-ID)
+        self._dirty_attempt_values: Set[Tuple[str, int, str]] = set()
+        self.step_results: List[Optional[StepResult]] = []  # Ein Platz pro Schritt, None = noch offen
         self.current_step_index: int = -1
         self.session_started_at: Optional[datetime] = None
-        self.current_step_started_at: Optional[datetime] = None
-        self.current_step_otbiolab_paths: List[str] = []  # Liste aller OTBioLab-Dateien für aktuellen Schritt (legacy)
-        self.current_step_field_otbiolab_files: Dict[str, List[str]] = {}  # Feld-ID → Liste von OTBioLab-Dateien
-        self.current_step_repeated_measurements: Dict[str, List[Dict[str, Any]]] = {}  # Feld-ID → Liste von Versuchen für wiederholbare Messungen
+        self._session_started_iso: Optional[str] = None  # session_started_at.isoformat(), einmal beim Start
+        self._session_paths: Dict[Tuple[str, str], Path] = {}  # (Ordner, Suffix) → Protokoll-/Referenz-Pfad
+        self.current_step_started_at_ns: Optional[int] = None
+        # Monotone Startzeiten für den Timer-Tick (datetimes bleiben für Protokoll/Export)
+        self._session_t0: Optional[float] = None
+        self._step_t0: Optional[float] = None
+        self._expected_total_str: str = "00:00:00"
+        self.step_state = StepState()  # OTBioLab-Dateien und Versuche des aktuellen Schritts
         self.session_timestamp: Optional[str] = None
         self._timer_after_id: Optional[str] = None
+        # Zuletzt angezeigte Timer-Werte, um unveränderte Tk-Updates zu überspringen
+        self._last_total_text: str = ""
+        self._last_step_text: str = ""
+        self._last_step_fg: str = ""
+        self._rebuild_pending: Optional[str] = None  # after_idle-ID eines angeforderten Schritt-Neuaufbaus
         self.session_finished: bool = False
+        self._summary_content: str = ""  # Inhalt von summary_text (schreibgeschützt, daher immer aktuell)
         self.reference_data: Optional[Dict[str, Any]] = None  # Geladene Referenz-Daten
+        self._ref_values_by_step: Dict[str, Dict[str, Any]] = {}  # Schritt-ID → Referenz-Werte
+        self._folder_dialog: Optional[PowerShellFolderDialog] = None  # Wird beim ersten Ordner-Dialog gestartet
+        self._folder_pick_pending = False  # PowerShell-Ordner-Dialog läuft gerade
+        self._otbiolab_worker = BackgroundWorker("otbiolab")  # Serialisiert alle OTBioLab-Übergaben
+        # Ergebnisse aus Hintergrundthreads: (Callback, Argumente), abgearbeitet im UI-Thread
+        self._ui_events: queue.SimpleQueue = queue.SimpleQueue()
+        self.bind("<<UiEvent>>", self._drain_ui_events)
 
         # Reminder System
         self.reminder_after_ids: Dict[str, str] = {}  # reminder_id → after_id für Abbruch
@@ -301,6 +980,12 @@ class SessionApp(tk.Tk):
         # Bind close event
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
 
+        # Fokus verfolgen, damit der Timer im Hintergrund seltener tickt (bind_all: auch Pop-ups)
+        self._window_focused: bool = True
+        self._focus_check_id: Optional[str] = None  # after_idle-ID der Prüfung nach FocusOut
+        self.bind_all("<FocusIn>", self._on_focus_in, add="+")
+        self.bind_all("<FocusOut>", self._on_focus_out, add="+")
+
         self._build_ui()
         self._show_frame("start")
 
@@ -314,26 +999,37 @@ class SessionApp(tk.Tk):
         self.container.rowconfigure(0, weight=1)
 
         self.frames: Dict[str, ttk.Frame] = {}
-        for name in ("start", "step", "summary"):
-            frame = ttk.Frame(self.container, padding=24)
-            frame.grid(row=0, column=0, sticky="nsew")
-            frame.columnconfigure(0, weight=1)
-            self.frames[name] = frame
-
+        # Schritt- und Zusammenfassungsansicht werden erst bei Bedarf aufgebaut
+        self._frame_builders: Dict[str, Any] = {
+            "step": self._build_step_frame,
+            "summary": self._build_summary_frame,
+        }
         self._build_start_frame()
-        self._build_step_frame()
-        self._build_summary_frame()
+
+    def _create_frame(self, name: str) -> ttk.Frame:
+        frame = ttk.Frame(self.container, padding=24)
+        frame.grid(row=0, column=0, sticky="nsew")
+        frame.columnconfigure(0, weight=1)
+        self.frames[name] = frame
+        return frame
+
+    def _ensure_frame(self, name: str) -> None:
+        """Baut eine Ansicht beim ersten Zugriff auf."""
+        builder = self._frame_builders.pop(name, None)
+        if builder is not None:
+            builder()
 
     def _show_frame(self, name: str) -> None:
+        self._ensure_frame(name)
         frame = self.frames.get(name)
         if frame:
             frame.tkraise()
 
     # Startseite -----------------------------------------------------------------
     def _build_start_frame(self) -> None:
-        frame = self.frames["start"]
+        frame = self._create_frame("start")
 
-        title = ttk.Label(frame, text="HDsEMG Versuchsreihe starten", font=("Segoe UI", 24, "bold"))
+        title = ttk.Label(frame, text="HDsEMG Versuchsreihe starten", font=self.fonts["start_title"])
         title.grid(row=0, column=0, sticky="w")
 
         self.declaration_info_var = tk.StringVar(value="Bitte Deklarationsdatei auswählen.")
@@ -371,6 +1067,9 @@ class SessionApp(tk.Tk):
         self.metadata_fields_frame = ttk.Frame(self.metadata_group)
         self.metadata_fields_frame.grid(row=0, column=0, sticky="nsew")
         self.metadata_fields_frame.columnconfigure(1, weight=1)
+        self.metadata_rows = FieldRowPool(
+            self.metadata_fields_frame, self._create_field_control, self._on_metadata_changed, keep_values=True
+        )
 
         self.start_button = ttk.Button(frame, text="Messung starten", command=self._start_session, state="disabled")
         self.start_button.grid(row=6, column=0, sticky="e")
@@ -378,7 +1077,9 @@ class SessionApp(tk.Tk):
         frame.rowconfigure(7, weight=1)
 
     def _choose_declaration(self) -> None:
-        initial_dir = str((ROOT_DIR / "config").resolve())
+        from tkinter import filedialog
+
+        initial_dir = str(CONFIG_DIR)
         path_str = filedialog.askopenfilename(
             parent=self,
             title="Deklarationsdatei auswählen",
@@ -402,75 +1103,109 @@ class SessionApp(tk.Tk):
         self._update_start_button_state()
 
     def _choose_output_dir(self) -> None:
-        print("DEBUG: _choose_output_dir gestartet")
+        log.debug("_choose_output_dir gestartet")
         try:
-            # Verwende PowerShell für zuverlässigen Ordner-Dialog auf Windows
             if sys.platform.startswith("win"):
-                print("DEBUG: Öffne PowerShell Ordner-Dialog...")
-                powershell_script = """
-                Add-Type -AssemblyName System.Windows.Forms
-                $dialog = New-Object System.Windows.Forms.FolderBrowserDialog
-                $dialog.Description = "OTBioLab Zielordner auswählen"
-                $dialog.ShowNewFolderButton = $true
-                $result = $dialog.ShowDialog()
-                if ($result -eq [System.Windows.Forms.DialogResult]::OK) {
-                    Write-Output $dialog.SelectedPath
-                }
-                """
-                result = subprocess.run(
-                    ["powershell", "-NoProfile", "-Command", powershell_script],
-                    capture_output=True,
-                    text=True,
-                    timeout=120
-                )
-                directory_str = result.stdout.strip()
-                print(f"DEBUG: Dialog geschlossen, Ergebnis: {directory_str}")
+                # Moderner Explorer-Dialog direkt per COM, ohne Prozessstart
+                try:
+                    log.debug("Öffne IFileOpenDialog")
+                    directory_str = windows_pick_folder(self, "OTBioLab Zielordner auswählen")
+                except (OSError, AttributeError) as exc:
+                    # Fallback: warm gehaltener PowerShell-Dialog (zuverlässig, aber eigener Prozess)
+                    log.debug("IFileOpenDialog nicht verfügbar (%s), öffne PowerShell Ordner-Dialog", exc)
+                    self._pick_output_dir_with_powershell()
+                    return
+                log.debug("Dialog geschlossen, Ergebnis: %r", directory_str)
             else:
                 # Fallback für andere Systeme
-                print("DEBUG: Öffne tkinter filedialog...")
+                from tkinter import filedialog
+
+                log.debug("Öffne tkinter filedialog")
                 directory_str = filedialog.askdirectory(title="OTBioLab Zielordner auswählen")
-                print(f"DEBUG: Dialog geschlossen, Ergebnis: {directory_str}")
+                log.debug("Dialog geschlossen, Ergebnis: %r", directory_str)
 
-            if directory_str:
-                self.output_dir = Path(directory_str)
-                self.output_dir_var.set(str(self.output_dir))
-                self._update_start_button_state()
-                print("DEBUG: Ordner erfolgreich gesetzt")
+            self._on_output_dir_chosen(directory_str)
         except Exception as e:
-            print(f"DEBUG: Exception aufgetreten: {e}")
-            import traceback
-            traceback.print_exc()
-            messagebox.showerror("Fehler", f"Fehler beim Öffnen des Ordner-Dialogs: {e}")
+            self._on_output_dir_error(e)
+
+    def _pick_output_dir_with_powershell(self) -> None:
+        """Zeigt den PowerShell-Dialog, ohne die Tk-Hauptschleife zu blockieren (Timer laufen weiter)."""
+        if self._folder_pick_pending:
+            return  # Dialog ist bereits offen; ein zweiter pick() würde dieselbe Pipe lesen
+        if self._folder_dialog is None:
+            self._folder_dialog = PowerShellFolderDialog()
+        dialog = self._folder_dialog
+        outcome: Dict[str, Any] = {}
+
+        def run() -> None:
+            try:
+                outcome["path"] = dialog.pick()
+            except Exception as exc:
+                outcome["error"] = exc
+
+        thread = threading.Thread(target=run, name="folder-dialog", daemon=True)
+        self._folder_pick_pending = True
+        thread.start()
+
+        def poll() -> None:
+            if thread.is_alive():
+                self.after(50, poll)
+                return
+            self._folder_pick_pending = False
+            if "error" in outcome:
+                self._on_output_dir_error(outcome["error"])
+            else:
+                log.debug("Dialog geschlossen, Ergebnis: %r", outcome.get("path", ""))
+                self._on_output_dir_chosen(outcome.get("path", ""))
+
+        self.after(50, poll)
+
+    def _on_output_dir_chosen(self, directory_str: str) -> None:
+        if directory_str:
+            self.output_dir = Path(directory_str).resolve()  # einmalig auflösen
+            self.output_dir_var.set(str(self.output_dir))
+            self._update_start_button_state()
+            log.debug("Ordner erfolgreich gesetzt")
+
+    def _on_output_dir_error(self, error: Exception) -> None:
+        log.error("Ordner-Dialog fehlgeschlagen", exc_info=error)
+        messagebox.showerror("Fehler", f"Fehler beim Öffnen des Ordner-Dialogs: {error}")
 
     def _rebuild_metadata_form(self) -> None:
-        for child in self.metadata_fields_frame.winfo_children():
-            child.destroy()
+        self.metadata_rows.release_all(self.declaration.metadata_fields if self.declaration else ())
         self.metadata_controls.clear()
+        self._required_unfilled.clear()
         if not self.declaration:
             return
+        today: Optional[str] = None  # Datum höchstens einmal pro Formularaufbau formatieren
         for row, field_cfg in enumerate(self.declaration.metadata_fields):
-            label = ttk.Label(self.metadata_fields_frame, text=field_cfg.label + (":" if not field_cfg.label.endswith(":") else ""))
-            label.grid(row=row, column=0, sticky="e", padx=(0, 12), pady=4)
-            control = self._create_field_control(self.metadata_fields_frame, field_cfg)
+            field_row = self.metadata_rows.acquire(field_cfg)
+            field_row.label.grid(row=row, column=0, sticky="e", padx=(0, 12), pady=4)
+            control = field_row.control
             control.widget.grid(row=row, column=1, sticky="ew", pady=4)
-            control.bind_on_change(self._update_start_button_state)
             self.metadata_controls[field_cfg.field_id] = control
 
-            # Setze "Mess-Tag" automatisch auf heute (prüfe field_id UND label)
-            field_lower = field_cfg.field_id.lower()
-            label_lower = field_cfg.label.lower()
-            if ("mess" in field_lower and "tag" in field_lower) or ("mess" in label_lower and "tag" in label_lower):
-                today = datetime.now().strftime("%d.%m.%Y")
+            # Setze "Mess-Tag" automatisch auf heute, sofern nicht schon befüllt
+            if field_cfg.is_date_auto and not control.get_value():
+                if today is None:
+                    today = datetime.now().strftime("%d.%m.%Y")
                 control.set_value(today)
-                print(f"DEBUG: Mess-Tag auf {today} gesetzt")
+                log.debug("Mess-Tag auf %s gesetzt", today)
 
         # Wende Referenz-Daten an, falls bereits geladen
         if self.reference_data:
             self._apply_reference_data()
 
+        # Einmalig vollständig erfassen; danach pflegt _on_metadata_changed die Menge inkrementell
+        self._required_unfilled = {
+            field_cfg.field_id
+            for field_cfg in self.declaration.metadata_fields
+            if field_cfg.required and not self.metadata_controls[field_cfg.field_id].get_value()
+        }
+
     # Schritt-Ansicht ------------------------------------------------------------
     def _build_step_frame(self) -> None:
-        frame = self.frames["step"]
+        frame = self._create_frame("step")
         frame.columnconfigure(0, weight=1)
         frame.rowconfigure(4, weight=1)
 
@@ -479,10 +1214,10 @@ class SessionApp(tk.Tk):
         header.columnconfigure(0, weight=1)
 
         self.session_title_var = tk.StringVar()
-        ttk.Label(header, textvariable=self.session_title_var, font=("Segoe UI", 22, "bold")).grid(row=0, column=0, sticky="w")
+        ttk.Label(header, textvariable=self.session_title_var, font=self.fonts["title"]).grid(row=0, column=0, sticky="w")
 
         self.total_timer_var = tk.StringVar(value="00:00:00")
-        total_label = ttk.Label(header, textvariable=self.total_timer_var, font=("Segoe UI", 32, "bold"))
+        total_label = ttk.Label(header, textvariable=self.total_timer_var, font=self.fonts["total_timer"])
         total_label.grid(row=0, column=1, sticky="e", padx=(24, 0))
 
         step_header = ttk.Frame(frame)
@@ -490,14 +1225,14 @@ class SessionApp(tk.Tk):
         step_header.columnconfigure(0, weight=1)
 
         self.current_step_var = tk.StringVar()
-        ttk.Label(step_header, textvariable=self.current_step_var, font=("Segoe UI", 18)).grid(row=0, column=0, sticky="w")
+        ttk.Label(step_header, textvariable=self.current_step_var, font=self.fonts["step_title"]).grid(row=0, column=0, sticky="w")
 
         self.step_timer_var = tk.StringVar(value="00:00:00")
         # Verwende tk.Label statt ttk.Label, um Farbe ändern zu können
         self.step_timer_label = tk.Label(
             step_header,
             textvariable=self.step_timer_var,
-            font=("Segoe UI", 28, "bold"),
+            font=self.fonts["step_timer"],
             fg="#000000"  # Schwarz als Standard
         )
         self.step_timer_label.grid(row=0, column=1, sticky="e")
@@ -525,6 +1260,13 @@ class SessionApp(tk.Tk):
         self.step_fields_frame = ttk.Frame(self.fields_canvas)
         self.fields_canvas_window = self.fields_canvas.create_window((0, 0), window=self.step_fields_frame, anchor="nw")
         self.step_fields_frame.columnconfigure(1, weight=1)
+        self.step_rows = FieldRowPool(self.step_fields_frame, self._create_field_control)
+        self.step_section_frames: List[ttk.LabelFrame] = []  # Frames wiederholbarer Messungen
+        self.step_attempt_frames: Dict[str, ttk.Frame] = {}  # Feld-ID → Container der Versuche
+        self.step_field_rows: Dict[str, FieldRow] = {}  # Feld-ID → angezeigte Feldzeile
+        # (Feld-ID, Versuchsindex) → Gitterzeilen mit OTBioLab-Buttons bzw. deren Dateiname-Labels
+        self.attempt_file_rows: Dict[Tuple[str, int], List[int]] = {}
+        self.attempt_file_labels: Dict[Tuple[str, int], List[ttk.Label]] = {}
 
         # Update scroll region wenn Frame sich ändert
         def _update_fields_scroll(event=None):
@@ -534,16 +1276,22 @@ class SessionApp(tk.Tk):
         self.step_fields_frame.bind("<Configure>", _update_fields_scroll)
         self.fields_canvas.bind("<Configure>", _update_fields_scroll)
 
-        # Mausrad-Scrolling
+        # Mausrad-Scrolling: Handler einmalig global binden, Enter/Leave schalten ihn nur scharf.
+        # (bind_all bei jedem Enter registrierte pro Mauseintritt einen neuen Tcl-Befehl samt Closure,
+        # den unbind_all nie wieder freigab.)
+        self._fields_wheel_active = False
+
         def _on_fields_mousewheel(event):
-            self.fields_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+            if self._fields_wheel_active:
+                self.fields_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
 
         def _on_fields_enter(event):
-            self.fields_canvas.bind_all("<MouseWheel>", _on_fields_mousewheel)
+            self._fields_wheel_active = True
 
         def _on_fields_leave(event):
-            self.fields_canvas.unbind_all("<MouseWheel>")
+            self._fields_wheel_active = False
 
+        self.fields_canvas.bind_all("<MouseWheel>", _on_fields_mousewheel, add="+")
         self.fields_canvas.bind("<Enter>", _on_fields_enter)
         self.fields_canvas.bind("<Leave>", _on_fields_leave)
 
@@ -581,11 +1329,11 @@ class SessionApp(tk.Tk):
 
     # Zusammenfassung ------------------------------------------------------------
     def _build_summary_frame(self) -> None:
-        frame = self.frames["summary"]
+        frame = self._create_frame("summary")
         frame.columnconfigure(0, weight=1)
         frame.rowconfigure(3, weight=1)
 
-        ttk.Label(frame, text="Messung abgeschlossen", font=("Segoe UI", 22, "bold")).grid(row=0, column=0, sticky="w")
+        ttk.Label(frame, text="Messung abgeschlossen", font=self.fonts["title"]).grid(row=0, column=0, sticky="w")
 
         self.summary_info_var = tk.StringVar()
         ttk.Label(frame, textvariable=self.summary_info_var, justify="left").grid(row=1, column=0, sticky="w", pady=(12, 12))
@@ -610,6 +1358,34 @@ class SessionApp(tk.Tk):
         ttk.Button(button_row, text="Neue Session", command=self._reset_to_start).grid(row=0, column=3)
 
     # Formular-Utilities ---------------------------------------------------------
+    @staticmethod
+    def _replace_text(widget: tk.Text, content: str) -> bool:
+        """Ersetzt den Inhalt eines Text-Widgets mit einem einzigen `replace`.
+
+        Ist der Inhalt bereits identisch, bleibt das Widget unangetastet (kein Relayout).
+        Gibt zurück, ob etwas geändert wurde.
+        """
+        if widget.get("1.0", "end-1c") == content:
+            return False
+        widget.replace("1.0", "end", content)
+        return True
+
+    def _set_summary_text(self, content: str) -> None:
+        """Setzt den Protokolltext und hält ihn in Python vor (Vergleich und Export ohne Tcl-Roundtrip)."""
+        if content == self._summary_content:
+            return
+        self._summary_content = content
+        widget = self.summary_text
+        widget.configure(state="normal")
+        widget.replace("1.0", "end", content)
+        widget.configure(state="disabled")
+
+    @staticmethod
+    def _set_state(widget: tk.Widget, state: str) -> None:
+        """Setzt den Widget-Status nur, wenn er sich ändert (spart Tcl-Roundtrip und Neuzeichnen)."""
+        if str(widget.cget("state")) != state:
+            widget.configure(state=state)
+
     def _create_field_control(self, parent: ttk.Frame, config: FieldConfig) -> FieldControl:
         kind = config.kind.lower()
         if kind == "multiline":
@@ -625,32 +1401,62 @@ class SessionApp(tk.Tk):
             widget.insert(0, "")
         return FieldControl(config, widget, variable)
 
+    def _show_field_row_buttons(self, field_row: FieldRow, row: int, field_id: str) -> None:
+        """Blendet die OTBioLab-Buttons einer Feldzeile ein (bei Erstbedarf werden sie angelegt)."""
+        if field_row.button_frame is None:
+            field_row.button_frame = ttk.Frame(self.step_fields_frame)
+            # OTBioLab übergeben Button
+            if save_in_word_dialog is not None:
+                field_row.save_button = ttk.Button(field_row.button_frame, text="📁", width=3)  # Datei-Symbol
+                field_row.save_button.pack(side="left", padx=(0, 4))
+            # Kopieren Button
+            field_row.copy_button = ttk.Button(field_row.button_frame, text="📋", width=3)  # Clipboard-Symbol
+            field_row.copy_button.pack(side="left")
+            field_row.count_label = ttk.Label(self.step_fields_frame, foreground="#1f6aa5")
+
+        if field_row.save_button is not None:
+            field_row.save_button.configure(command=partial(self._trigger_field_otbiolab_save, field_id))
+        field_row.copy_button.configure(command=partial(self._copy_field_filename, field_id))
+        field_row.button_frame.grid(row=row, column=2, sticky="w", padx=(8, 0), pady=4)
+        self._show_field_file_count(field_row, row, field_id)
+
+    def _show_field_file_count(self, field_row: FieldRow, row: int, field_id: str) -> None:
+        """Zeigt die Anzahl der bereits übergebenen Dateien neben den Buttons an."""
+        count = len(self.step_state.field_otbiolab_files.get(field_id, []))
+        if count > 0:
+            field_row.count_label.configure(text=f"({count})")
+            field_row.count_label.grid(row=row, column=3, sticky="w", padx=(4, 0), pady=4)
+
     def _add_repeated_measurement_ui(self, start_row: int, field_cfg: FieldConfig) -> None:
         """Erstellt UI für wiederholbare Messungen mit dynamischen Versuchen."""
         # LabelFrame für diese wiederholbare Messung
+        # Der Block wird erst vollständig aufgebaut und dann gegridet: solange die Frames
+        # nicht gemappt sind, löst das Einfügen der Versuche keine Geometrie-Neuberechnung aus.
         frame = ttk.LabelFrame(self.step_fields_frame, text=field_cfg.label, padding=10)
-        frame.grid(row=start_row, column=0, columnspan=4, sticky="ew", pady=8)
+        self.step_section_frames.append(frame)
         frame.columnconfigure(1, weight=1)
 
         # Hole existierende Versuche
-        attempts = self.current_step_repeated_measurements.get(field_cfg.field_id, [])
+        attempts = self.step_state.repeated_measurements.get(field_cfg.field_id, [])
 
         # Container für alle Versuche
         attempts_frame = ttk.Frame(frame)
-        attempts_frame.grid(row=0, column=0, columnspan=2, sticky="ew")
         attempts_frame.columnconfigure(1, weight=1)
+        self.step_attempt_frames[field_cfg.field_id] = attempts_frame
 
         # Zeige jeden Versuch
         for attempt_idx, attempt_data in enumerate(attempts):
             self._render_single_attempt(attempts_frame, field_cfg, attempt_idx, attempt_data)
+        attempts_frame.grid(row=0, column=0, columnspan=2, sticky="ew")
 
         # "Versuch hinzufügen" Button
         add_btn = ttk.Button(
             frame,
             text="+ Versuch hinzufügen",
-            command=lambda: self._add_new_attempt(field_cfg)
+            command=partial(self._add_new_attempt, field_cfg)
         )
         add_btn.grid(row=1, column=0, columnspan=2, pady=(8, 0), sticky="w")
+        frame.grid(row=start_row, column=0, columnspan=4, sticky="ew", pady=8)
 
     def _render_single_attempt(self, parent: ttk.Frame, field_cfg: FieldConfig, attempt_idx: int, attempt_data: Dict[str, Any]) -> None:
         """Rendert einen einzelnen Versuch mit allen Sub-Feldern."""
@@ -660,27 +1466,37 @@ class SessionApp(tk.Tk):
             sep.grid(row=attempt_idx * 100, column=0, columnspan=4, sticky="ew", pady=(8, 8))
 
         # Header: Versuch #N
-        header = ttk.Label(parent, text=f"Versuch {attempt_idx + 1}", font=("Segoe UI", 10, "bold"))
+        header = ttk.Label(parent, text=f"Versuch {attempt_idx + 1}", font=self.fonts["attempt_header"])
         header.grid(row=attempt_idx * 100 + 1, column=0, columnspan=4, sticky="w", pady=(0, 4))
 
+        # Versuche werden immer in Reihenfolge gerendert (neue werden angehängt)
+        sub_controls: Dict[str, FieldControl] = {}
+        self.attempt_controls.setdefault(field_cfg.field_id, []).append(sub_controls)
+
         # Render Sub-Felder
+        file_rows: List[int] = []
         for sub_row, sub_field_cfg in enumerate(field_cfg.repeated_fields):
             actual_row = attempt_idx * 100 + 2 + sub_row
 
             # Label
-            label = ttk.Label(parent, text=sub_field_cfg.label + ":")
+            label = ttk.Label(parent, text=sub_field_cfg.display_label)
             label.grid(row=actual_row, column=0, sticky="e", padx=(0, 12), pady=2)
 
             # Control
-            control_key = f"{field_cfg.field_id}__attempt{attempt_idx}__{sub_field_cfg.field_id}"
             control = self._create_field_control(parent, sub_field_cfg)
             control.widget.grid(row=actual_row, column=1, sticky="ew", pady=2)
 
-            # Setze gespeicherten Wert
+            # Setze gespeicherten Wert; ohne gespeicherten Wert muss der Startwert gesichert werden
+            dirty_key = (field_cfg.field_id, attempt_idx, sub_field_cfg.field_id)
             if sub_field_cfg.field_id in attempt_data:
                 control.set_value(attempt_data[sub_field_cfg.field_id])
+                if isinstance(control.widget, tk.Text):
+                    control.widget.edit_modified(False)  # sonst meldet <<Modified>> spätere Eingaben nicht
+            else:
+                self._dirty_attempt_values.add(dirty_key)
+            control.bind_on_change(partial(self._dirty_attempt_values.add, dirty_key))
 
-            self.step_controls[control_key] = control
+            sub_controls[sub_field_cfg.field_id] = control
 
             # OTBioLab Buttons (wenn Template vorhanden)
             if field_cfg.otbiolab_template:
@@ -693,7 +1509,7 @@ class SessionApp(tk.Tk):
                         button_frame,
                         text="📁",
                         width=3,
-                        command=lambda fid=field_cfg.field_id, idx=attempt_idx: self._trigger_repeated_measurement_otbiolab_save(fid, idx)
+                        command=partial(self._trigger_repeated_measurement_otbiolab_save, field_cfg.field_id, attempt_idx)
                     )
                     btn.pack(side="left", padx=(0, 4))
 
@@ -702,35 +1518,50 @@ class SessionApp(tk.Tk):
                     button_frame,
                     text="📋",
                     width=3,
-                    command=lambda fid=field_cfg.field_id, idx=attempt_idx: self._copy_repeated_measurement_filename(fid, idx)
+                    command=partial(self._copy_repeated_measurement_filename, field_cfg.field_id, attempt_idx)
                 )
                 copy_btn.pack(side="left")
-
-                # Zeige Dateiname, wenn vorhanden
-                if "otbiolab_file" in attempt_data:
-                    file_label = ttk.Label(
-                        parent,
-                        text=f"✓ {Path(attempt_data['otbiolab_file']).name}",
-                        foreground="#1f6aa5"
-                    )
-                    file_label.grid(row=actual_row, column=3, sticky="w", padx=(4, 0), pady=2)
+                file_rows.append(actual_row)
+
+        self.attempt_file_rows[(field_cfg.field_id, attempt_idx)] = file_rows
+        # Zeige Dateiname, wenn vorhanden
+        if "otbiolab_file" in attempt_data:
+            self._show_attempt_file(parent, field_cfg.field_id, attempt_idx, attempt_data)
+
+    def _show_attempt_file(self, parent: ttk.Frame, field_id: str, attempt_idx: int, attempt_data: Dict[str, Any]) -> None:
+        """Zeigt den Dateinamen eines Versuchs neben dessen Buttons an (vorhandene Labels werden aktualisiert)."""
+        key = (field_id, attempt_idx)
+        text = f"✓ {attempt_file_name(attempt_data)}"
+        labels = self.attempt_file_labels.get(key)
+        if labels:
+            for file_label in labels:
+                file_label.configure(text=text)
+            return
+        labels = self.attempt_file_labels[key] = []
+        for row in self.attempt_file_rows.get(key, ()):
+            file_label = ttk.Label(parent, text=text, foreground="#1f6aa5")
+            file_label.grid(row=row, column=3, sticky="w", padx=(4, 0), pady=2)
+            labels.append(file_label)
 
     def _add_new_attempt(self, field_cfg: FieldConfig) -> None:
         """Fügt einen neuen Versuch hinzu und aktualisiert die UI."""
-        if field_cfg.field_id not in self.current_step_repeated_measurements:
-            self.current_step_repeated_measurements[field_cfg.field_id] = []
+        attempts = self.step_state.repeated_measurements.setdefault(field_cfg.field_id, [])
 
         # Speichere aktuelle Werte aller Felder vor UI-Rebuild
-        if self.declaration:
-            step = self.declaration.steps[self.current_step_index]
-            self._save_repeated_measurement_values(step)
+        self._save_repeated_measurement_values()
 
         # Neuen leeren Versuch hinzufügen
         new_attempt = {}
-        self.current_step_repeated_measurements[field_cfg.field_id].append(new_attempt)
+        attempts.append(new_attempt)
+
+        # Nur den neuen Versuch aufbauen; die vorhandenen Versuche bleiben unverändert stehen
+        attempts_frame = self.step_attempt_frames.get(field_cfg.field_id)
+        if attempts_frame is not None and attempts_frame.winfo_exists():
+            self._render_single_attempt(attempts_frame, field_cfg, len(attempts) - 1, new_attempt)
+            return
 
         # UI neu aufbauen um den neuen Versuch anzuzeigen
-        self._show_current_step()
+        self._request_rebuild()
 
     def _trigger_repeated_measurement_otbiolab_save(self, field_id: str, attempt_idx: int) -> None:
         """Triggered OTBioLab Save für einen spezifischen Versuch."""
@@ -738,11 +1569,7 @@ class SessionApp(tk.Tk):
             return
 
         step = self.declaration.steps[self.current_step_index]
-        field_cfg = None
-        for f in step.fields:
-            if f.field_id == field_id:
-                field_cfg = f
-                break
+        field_cfg = step.fields_by_id.get(field_id)
 
         if not field_cfg or not field_cfg.otbiolab_template:
             return
@@ -752,8 +1579,10 @@ class SessionApp(tk.Tk):
         context["field_id"] = field_id
         context["attempt_number"] = attempt_idx + 1  # 1-based für Dateinamen
 
-        filename = field_cfg.otbiolab_template.format(**context)
+        filename = render_template(field_cfg.otbiolab_template, field_cfg.otbiolab_template_parts, context)
         full_path = self.output_dir / filename
+        if not self._ensure_otbiolab_program():
+            return
 
         self.status_var.set(f"Warte auf OTBioLab Speichern-Dialog für Versuch {attempt_idx + 1}...")
         self.update_idletasks()
@@ -768,69 +1597,64 @@ class SessionApp(tk.Tk):
             except Exception as exc:
                 message = f"Fehler: {exc}"
 
-            self.after(0, lambda: self._on_repeated_measurement_interceptor_finished(success, message, full_path, field_id, attempt_idx))
+            self._post_to_ui(self._on_repeated_measurement_interceptor_finished, success, message, full_path, field_id, attempt_idx)
 
-        threading.Thread(target=callback, daemon=True).start()
+        self._otbiolab_worker.submit(callback)
 
     def _on_repeated_measurement_interceptor_finished(self, success: bool, message: str, path: Path, field_id: str, attempt_idx: int) -> None:
         """Callback nach OTBioLab Save für wiederholbare Messung."""
         if success:
             # Speichere Dateiname in attempt_data
-            attempts = self.current_step_repeated_measurements.get(field_id, [])
+            attempts = self.step_state.repeated_measurements.get(field_id, [])
             if attempt_idx < len(attempts):
-                attempts[attempt_idx]["otbiolab_file"] = str(path)
+                attempt_data = attempts[attempt_idx]
+                attempt_data["otbiolab_file"] = str(path)
+                attempt_data["otbiolab_file_name"] = path.name
 
-            # Speichere alle aktuellen Werte vor UI-Rebuild
-            step = self.declaration.steps[self.current_step_index]
-            self._save_repeated_measurement_values(step)
-
-            # UI neu aufbauen
-            self._show_current_step()
+                # Nur das Dateiname-Label des Versuchs aktualisieren, kein UI-Rebuild
+                attempts_frame = self.step_attempt_frames.get(field_id)
+                if attempts_frame is not None:
+                    self._show_attempt_file(attempts_frame, field_id, attempt_idx, attempt_data)
 
             self.status_var.set(f"✓ {message}")
         else:
             self.status_var.set(f"✗ {message}")
 
-    def _save_repeated_measurement_values(self, step: StepConfig) -> None:
-        """Speichert alle Werte aus wiederholbaren Messungen vor UI-Rebuild."""
-        for field_cfg in step.fields:
-            if not field_cfg.repeated_measurement:
-                continue
-
-            attempts = self.current_step_repeated_measurements.get(field_cfg.field_id, [])
-            for attempt_idx in range(len(attempts)):
-                for sub_field_cfg in field_cfg.repeated_fields:
-                    control_key = f"{field_cfg.field_id}__attempt{attempt_idx}__{sub_field_cfg.field_id}"
-                    control = self.step_controls.get(control_key)
-                    if control:
-                        attempts[attempt_idx][sub_field_cfg.field_id] = control.get_value()
+    def _save_repeated_measurement_values(self) -> None:
+        """Übernimmt geänderte Werte aus den Versuchs-Controls in die Versuchsdaten."""
+        dirty = self._dirty_attempt_values
+        if not dirty:
+            return
+        measurements = self.step_state.repeated_measurements
+        for field_id, attempt_idx, sub_field_id in dirty:
+            attempts = measurements.get(field_id, ())
+            controls_by_attempt = self.attempt_controls.get(field_id, ())
+            if attempt_idx < len(attempts) and attempt_idx < len(controls_by_attempt):
+                attempts[attempt_idx][sub_field_id] = controls_by_attempt[attempt_idx][sub_field_id].get_value()
+        dirty.clear()
+
+    def _on_metadata_changed(self, control: FieldControl) -> None:
+        """Aktualisiert die Menge unausgefüllter Pflichtfelder für ein geändertes Metadaten-Feld."""
+        field_cfg = control.config
+        if field_cfg.required and self.metadata_controls.get(field_cfg.field_id) is control:
+            if control.get_value():
+                self._required_unfilled.discard(field_cfg.field_id)
+            else:
+                self._required_unfilled.add(field_cfg.field_id)
+        self._schedule_start_button_update()
+
+    def _schedule_start_button_update(self) -> None:
+        """Fasst schnelle Änderungen (z.B. Tastenanschläge) zu einem Button-Update zusammen."""
+        if self._pending_validate_id is None:
+            self._pending_validate_id = self.after(50, self._run_start_button_update)
+
+    def _run_start_button_update(self) -> None:
+        self._pending_validate_id = None
+        self._update_start_button_state()
 
     def _update_start_button_state(self) -> None:
-        ready = self.declaration is not None and self.output_dir is not None
-        if ready and self.declaration:
-            for field_cfg in self.declaration.metadata_fields:
-                control = self.metadata_controls.get(field_cfg.field_id)
-                value = control.get_value() if control else ""
-                if field_cfg.required and not value:
-                    ready = False
-                    break
-        self.start_button.configure(state=("normal" if ready else "disabled"))
-
-    def _coerce_value(self, field_cfg: FieldConfig, value: str) -> Tuple[Any, bool]:
-        if value == "":
-            return ("", not field_cfg.required)
-        if field_cfg.kind == "integer":
-            try:
-                return int(value), True
-            except ValueError:
-                return value, False
-        if field_cfg.kind == "float":
-            try:
-                safe_value = value.replace(",", ".")
-                return float(safe_value), True
-            except ValueError:
-                return value, False
-        return value, True
+        ready = self.declaration is not None and self.output_dir is not None and not self._required_unfilled
+        self._set_state(self.start_button, "normal" if ready else "disabled")
 
     # Reminder System ------------------------------------------------------------
     def _start_reminders(self) -> None:
@@ -897,14 +1721,14 @@ class SessionApp(tk.Tk):
         # Titel mit Icon
         title_frame = ttk.Frame(main_frame)
         title_frame.pack(fill="x", pady=(0, 15))
-        ttk.Label(title_frame, text="⏰", font=("Segoe UI", 32)).pack(side="left", padx=(0, 10))
-        ttk.Label(title_frame, text="Erinnerung", font=("Segoe UI", 18, "bold")).pack(side="left")
+        ttk.Label(title_frame, text="⏰", font=self.fonts["reminder_icon"]).pack(side="left", padx=(0, 10))
+        ttk.Label(title_frame, text="Erinnerung", font=self.fonts["reminder_title"]).pack(side="left")
 
         # Reminder Text
         text_label = ttk.Label(
             main_frame,
             text=reminder.text,
-            font=("Segoe UI", 12),
+            font=self.fonts["reminder_text"],
             wraplength=450,
             justify="left"
         )
@@ -913,7 +1737,7 @@ class SessionApp(tk.Tk):
         # Info über nächste Erinnerung
         next_time = datetime.now() + timedelta(minutes=reminder.interval_minutes)
         info_text = f"Nächste Erinnerung in {reminder.interval_minutes} Minuten ({next_time.strftime('%H:%M')} Uhr)"
-        ttk.Label(main_frame, text=info_text, font=("Segoe UI", 9), foreground="#666").pack(pady=(10, 20))
+        ttk.Label(main_frame, text=info_text, font=self.fonts["hint"], foreground="#666").pack(pady=(10, 20))
 
         # Buttons
         button_frame = ttk.Frame(main_frame)
@@ -941,30 +1765,41 @@ class SessionApp(tk.Tk):
         if not self.declaration:
             return
         metadata_values: Dict[str, Any] = {}
+        get_control = self.metadata_controls.get
+        warn = messagebox.showwarning
         for field_cfg in self.declaration.metadata_fields:
-            control = self.metadata_controls.get(field_cfg.field_id)
-            raw_value = control.get_value() if control else ""
-            typed_value, ok = self._coerce_value(field_cfg, raw_value)
+            field_id = field_cfg.field_id
+            control = get_control(field_id)
+            if control:
+                raw_value, typed_value, ok = control.get_typed_value()
+            else:
+                raw_value = ""
+                typed_value, ok = coerce_value(field_cfg, raw_value)
             if not ok:
-                messagebox.showwarning("Eingabe prüfen", f"Bitte gültigen Wert für '{field_cfg.label}' eintragen.")
+                warn("Eingabe prüfen", f"Bitte gültigen Wert für '{field_cfg.label}' eintragen.")
                 return
             if field_cfg.required and raw_value == "":
-                messagebox.showwarning("Eingabe fehlt", f"Bitte Feld '{field_cfg.label}' ausfüllen.")
+                warn("Eingabe fehlt", f"Bitte Feld '{field_cfg.label}' ausfüllen.")
                 return
-            metadata_values[field_cfg.field_id] = typed_value if raw_value != "" else ""
+            metadata_values[field_id] = typed_value  # coerce_value liefert für leere Eingaben bereits ""
         self.metadata_values = metadata_values
+        self._step_context_base = None
         self.session_started_at = datetime.now()
+        self._session_started_iso = self.session_started_at.isoformat()
+        self._session_paths.clear()
         self.session_timestamp = self.session_started_at.strftime("%Y%m%d_%H%M%S")
         self.current_step_index = 0
-        self.current_step_started_at = datetime.now()
-        self.step_results = []
-        self.current_step_otbiolab_paths = []
-        self.current_step_field_otbiolab_files = {}
-        self.current_step_repeated_measurements = {}
+        self.current_step_started_at_ns = time.time_ns()
+        self._session_t0 = self._step_t0 = time.monotonic()
+        self._expected_total_str = seconds_to_clock(
+            sum(step.expected_duration_seconds or 0 for step in self.declaration.steps)
+        )
+        self.step_results = [None] * len(self.declaration.steps)
+        self.step_state = StepState()
+        self._show_frame("step")
         self.session_title_var.set(self.declaration.title)
         self._schedule_timer(reset=True)
         self._start_reminders()  # Starte Erinnerungs-Timer
-        self._show_frame("step")
         self._show_current_step()
 
     def _schedule_timer(self, reset: bool = False) -> None:
@@ -972,30 +1807,52 @@ class SessionApp(tk.Tk):
             self.after_cancel(self._timer_after_id)
             self._timer_after_id = None
         self._update_timer_labels()
-        self._timer_after_id = self.after(500, self._schedule_timer)
+        # Ohne Fokus (z.B. während in OTBioLab gearbeitet wird) seltener aktualisieren
+        delay_ms = 1000 if self._window_focused else 2000
+        if self._session_t0 is not None:
+            # Auf den Sekundenwechsel der Gesamtzeit ausrichten (+5 ms Reserve), damit sich
+            # Verspätungen des after-Callbacks nicht aufsummieren und keine Sekunde übersprungen wird
+            phase_ms = int((time.monotonic() - self._session_t0) * 1000) % 1000
+            delay_ms -= phase_ms - 5
+        self._timer_after_id = self.after(delay_ms, self._schedule_timer)
+
+    def _on_focus_in(self, event: tk.Event) -> None:
+        if self._window_focused:
+            return
+        self._window_focused = True
+        # Sofort aktualisieren und zurück zum Sekundentakt
+        if self._timer_after_id:
+            self._schedule_timer(reset=True)
 
-    def _update_timer_labels(self) -> None:
-        now = datetime.now()
+    def _on_focus_out(self, event: tk.Event) -> None:
+        # Fokuswechsel innerhalb der App liefert FocusOut + FocusIn; erst im Leerlauf prüfen,
+        # ob die App den Fokus wirklich verloren hat, sonst setzt jeder Tab den Timer-Takt zurück
+        if self._focus_check_id is None:
+            self._focus_check_id = self.after_idle(self._check_window_focus)
 
-        # Gesamt-Timer: Aktuelle Zeit / Erwartete Gesamtdauer
-        if self.session_started_at and self.declaration:
-            total_seconds = (now - self.session_started_at).total_seconds()
+    def _check_window_focus(self) -> None:
+        self._focus_check_id = None
+        # "focus -displayof" direkt: focus_displayof() scheitert an Widgets ohne Python-Objekt (Combobox-Popdown)
+        if not self.tk.call("focus", "-displayof", self._w):
+            self._window_focused = False
 
-            # Berechne erwartete Gesamtdauer
-            expected_total = sum(
-                step.expected_duration_seconds or 0
-                for step in self.declaration.steps
-            )
+    def _update_timer_labels(self) -> None:
+        # Minimiertes Fenster: nichts zeichnen, der nächste Tick holt den Stand nach
+        if self.state() == "iconic":
+            return
 
-            current_time = seconds_to_clock(total_seconds)
-            expected_time = seconds_to_clock(expected_total)
-            self.total_timer_var.set(f"{current_time}/{expected_time}")
+        now = time.monotonic()
+
+        # Gesamt-Timer: Aktuelle Zeit / Erwartete Gesamtdauer (in _start_session vorberechnet)
+        if self._session_t0 is not None and self.declaration:
+            total_text = f"{seconds_to_clock(now - self._session_t0)}/{self._expected_total_str}"
         else:
-            self.total_timer_var.set("00:00:00")
+            total_text = "00:00:00"
 
         # Schritt-Timer: MM:SS Format
-        if self.current_step_started_at and self.declaration:
-            step_seconds = (now - self.current_step_started_at).total_seconds()
+        step_fg = "#000000"  # Schwarz
+        if self._step_t0 is not None and self.declaration:
+            step_seconds = now - self._step_t0
 
             # Prüfe ob Zeit überschritten
             step = self.declaration.steps[self.current_step_index]
@@ -1004,18 +1861,35 @@ class SessionApp(tk.Tk):
             if expected and step_seconds > expected:
                 # Zeit überschritten - zeige Überschreitung und färbe rot
                 overtime = step_seconds - expected
-                self.step_timer_var.set(f"-{seconds_to_minutes_clock(overtime)}")
-                self.step_timer_label.config(fg="#DC143C")  # Crimson Red
+                step_text = f"-{seconds_to_minutes_clock(overtime)}"
+                step_fg = "#DC143C"  # Crimson Red
             else:
                 # Normal - zeige Zeit und färbe schwarz
-                self.step_timer_var.set(seconds_to_minutes_clock(step_seconds))
-                self.step_timer_label.config(fg="#000000")  # Schwarz
+                step_text = seconds_to_minutes_clock(step_seconds)
         else:
-            self.step_timer_var.set("00:00")
-            if hasattr(self, 'step_timer_label'):
-                self.step_timer_label.config(fg="#000000")
+            step_text = "00:00"
+
+        # Nur geänderte Werte an Tk übergeben (jeder set/config ist ein Tcl-Aufruf)
+        if total_text != self._last_total_text:
+            self.total_timer_var.set(total_text)
+            self._last_total_text = total_text
+        if step_text != self._last_step_text:
+            self.step_timer_var.set(step_text)
+            self._last_step_text = step_text
+        if step_fg != self._last_step_fg:
+            self.step_timer_label.config(fg=step_fg)
+            self._last_step_fg = step_fg
+
+    def _request_rebuild(self) -> None:
+        """Fordert einen Neuaufbau des Schritts an; mehrere Anforderungen bis zum Leerlauf ergeben einen Aufbau."""
+        if self._rebuild_pending is None:
+            self._rebuild_pending = self.after_idle(self._show_current_step)
 
     def _show_current_step(self) -> None:
+        if self._rebuild_pending is not None:
+            # Ein direkter Aufbau (auch der angeforderte selbst) erledigt die offene Anforderung
+            self.after_cancel(self._rebuild_pending)
+            self._rebuild_pending = None
         if not self.declaration:
             return
         step = self.declaration.steps[self.current_step_index]
@@ -1028,9 +1902,18 @@ class SessionApp(tk.Tk):
         else:
             self.expected_duration_var.set("")
 
-        for child in self.step_fields_frame.winfo_children():
-            child.destroy()
+        # Normale Feldzeilen werden wiederverwendet, nur wiederholbare Messungen neu aufgebaut
+        self.step_rows.release_all()
+        for section in self.step_section_frames:
+            section.destroy()
+        self.step_section_frames.clear()
+        self.step_attempt_frames.clear()
+        self.attempt_file_rows.clear()
+        self.attempt_file_labels.clear()
+        self.step_field_rows.clear()
         self.step_controls.clear()
+        self.attempt_controls.clear()
+        self._dirty_attempt_values.clear()
 
         # Konfiguriere Spalten: Label (0), Control (1), OTBioLab-Button (2)
         self.step_fields_frame.columnconfigure(1, weight=1)
@@ -1042,92 +1925,56 @@ class SessionApp(tk.Tk):
                 self._add_repeated_measurement_ui(row, field_cfg)
                 row += 1  # Repeated measurement nimmt eine Zeile (wird intern erweitert)
             else:
-                # Normales Feld
-                # Label
-                label = ttk.Label(self.step_fields_frame, text=field_cfg.label + (":" if not field_cfg.label.endswith(":") else ""))
-                label.grid(row=row, column=0, sticky="e", padx=(0, 12), pady=4)
-
-                # Control (Input-Feld)
-                control = self._create_field_control(self.step_fields_frame, field_cfg)
+                # Normales Feld: Label + Control (Input-Feld)
+                field_row = self.step_rows.acquire(field_cfg)
+                field_row.label.grid(row=row, column=0, sticky="e", padx=(0, 12), pady=4)
+                control = field_row.control
                 control.widget.grid(row=row, column=1, sticky="ew", pady=4)
                 self.step_controls[field_cfg.field_id] = control
+                self.step_field_rows[field_cfg.field_id] = field_row
 
                 # OTBioLab-Buttons (wenn Feld ein Template hat)
                 if field_cfg.otbiolab_template:
-                    button_frame = ttk.Frame(self.step_fields_frame)
-                    button_frame.grid(row=row, column=2, sticky="w", padx=(8, 0), pady=4)
-
-                    # OTBioLab übergeben Button
-                    if save_in_word_dialog is not None:
-                        btn = ttk.Button(
-                            button_frame,
-                            text="📁",  # Datei-Symbol
-                            width=3,
-                            command=lambda fid=field_cfg.field_id: self._trigger_field_otbiolab_save(fid)
-                        )
-                        btn.pack(side="left", padx=(0, 4))
-
-                    # Kopieren Button
-                    copy_btn = ttk.Button(
-                        button_frame,
-                        text="📋",  # Clipboard-Symbol
-                        width=3,
-                        command=lambda fid=field_cfg.field_id: self._copy_field_filename(fid)
-                    )
-                    copy_btn.pack(side="left")
-
-                    # Zeige Anzahl der bereits übergebenen Dateien
-                    if field_cfg.field_id in self.current_step_field_otbiolab_files:
-                        count = len(self.current_step_field_otbiolab_files[field_cfg.field_id])
-                        if count > 0:
-                            count_label = ttk.Label(
-                                self.step_fields_frame,
-                                text=f"({count})",
-                                foreground="#1f6aa5"
-                            )
-                            count_label.grid(row=row, column=3, sticky="w", padx=(4, 0), pady=4)
+                    self._show_field_row_buttons(field_row, row, field_cfg.field_id)
                 row += 1
 
         # Wende Referenz-Daten an (falls vorhanden und Felder mit use_from_ref=true)
-        if self.reference_data and "steps" in self.reference_data:
-            ref_steps = self.reference_data.get("steps", {})
-            if step.step_id in ref_steps:
-                ref_step_values = ref_steps[step.step_id].get("values", {})
-                for field_cfg in step.fields:
-                    if field_cfg.use_from_ref and field_cfg.field_id in ref_step_values:
-                        control = self.step_controls.get(field_cfg.field_id)
-                        if control:
-                            control.set_value(ref_step_values[field_cfg.field_id])
-                            print(f"DEBUG: Referenz-Wert übernommen für Schritt '{step.step_id}', Feld '{field_cfg.field_id}': {ref_step_values[field_cfg.field_id]}")
-
-        existing = self.step_results[self.current_step_index] if len(self.step_results) > self.current_step_index else None
-        if existing:
-            for field_cfg in step.fields:
-                if not field_cfg.repeated_measurement:
-                    control = self.step_controls.get(field_cfg.field_id)
+        get_control = self.step_controls.get
+        ref_step_values = self._ref_values_by_step.get(step.step_id)
+        if ref_step_values:
+            for field_id in step.ref_field_ids:
+                if field_id in ref_step_values:
+                    control = get_control(field_id)
                     if control:
-                        control.set_value(existing.values.get(field_cfg.field_id, ""))
-            self.notes_text.delete("1.0", "end")
-            self.notes_text.insert("1.0", existing.notes or "")
-            self.current_step_otbiolab_paths = list(existing.otbiolab_paths)  # Liste kopieren (legacy)
-            self.current_step_field_otbiolab_files = {k: list(v) for k, v in existing.field_otbiolab_files.items()}  # Deep copy
-            # Restore repeated measurements
-            self.current_step_repeated_measurements = {k: [dict(attempt) for attempt in v] for k, v in existing.repeated_measurements.items()}  # Deep copy
+                        control.set_value(ref_step_values[field_id])
+                        log.debug("Referenz-Wert übernommen für Schritt %r, Feld %r: %r", step.step_id, field_id, ref_step_values[field_id])
+
+        existing = self.step_results[self.current_step_index]
+        if existing:
+            existing_values = existing.values
+            for field_cfg in step.plain_fields:
+                field_id = field_cfg.field_id
+                control = get_control(field_id)
+                if control:
+                    control.set_value(existing_values.get(field_id, ""))
+            self._replace_text(self.notes_text, existing.notes or "")
+            # step_state wurde beim Betreten des Schritts aus dem Ergebnis kopiert (_load_step_state)
         else:
             # Wenn wir zu einem neuen Schritt gewechselt sind (erkennbar an leeren Dictionaries), lösche Notizen
             # Beim UI-Rebuild während der Bearbeitung bleiben die Werte erhalten
-            if not self.current_step_repeated_measurements and not self.current_step_field_otbiolab_files and not self.current_step_otbiolab_paths:
-                self.notes_text.delete("1.0", "end")
+            if self.step_state.is_empty():
+                self._replace_text(self.notes_text, "")
 
         placeholder = step.notes_placeholder or "Notizen zur Messung"
         self.notes_placeholder_var.set(placeholder)
         self.notes_text.edit_modified(False)
-        self.back_button.configure(state=("normal" if self.current_step_index > 0 else "disabled"))
+        self._set_state(self.back_button, "normal" if self.current_step_index > 0 else "disabled")
         trigger_allowed = bool(step.otbiolab_template) and save_in_word_dialog is not None
-        self.trigger_button.configure(state=("normal" if trigger_allowed else "disabled"))
+        self._set_state(self.trigger_button, "normal" if trigger_allowed else "disabled")
         copy_allowed = bool(step.otbiolab_template)
-        self.copy_step_filename_button.configure(state=("normal" if copy_allowed else "disabled"))
-        self.status_var.set("")
+        self._set_state(self.copy_step_filename_button, "normal" if copy_allowed else "disabled")
+        if self.status_var.get():
+            self.status_var.set("")
         # Timer wird in _start_session, _complete_step und _back_to_previous_step gesetzt, nicht hier
 
     def _complete_step(self) -> None:
@@ -1137,51 +1984,55 @@ class SessionApp(tk.Tk):
 
         # Validiere und sammle normale Feld-Werte
         values: Dict[str, Any] = {}
-        for field_cfg in step.fields:
-            if field_cfg.repeated_measurement:
-                # Überspringe wiederholbare Messungen - die werden separat gespeichert
-                continue
-
-            control = self.step_controls.get(field_cfg.field_id)
-            raw_value = control.get_value() if control else ""
-            typed_value, ok = self._coerce_value(field_cfg, raw_value)
+        get_control = self.step_controls.get
+        warn = messagebox.showwarning
+        # Wiederholbare Messungen werden separat gespeichert
+        for field_cfg in step.plain_fields:
+            control = get_control(field_cfg.field_id)
+            if control:
+                raw_value, typed_value, ok = control.get_typed_value()
+            else:
+                raw_value = ""
+                typed_value, ok = coerce_value(field_cfg, raw_value)
             if field_cfg.required and raw_value == "":
-                messagebox.showwarning("Eingabe fehlt", f"Bitte Feld '{field_cfg.label}' ausfüllen.")
+                warn("Eingabe fehlt", f"Bitte Feld '{field_cfg.label}' ausfüllen.")
                 return
             if not ok:
-                messagebox.showwarning("Eingabe prüfen", f"Bitte gültigen Wert für '{field_cfg.label}' eintragen.")
+                warn("Eingabe prüfen", f"Bitte gültigen Wert für '{field_cfg.label}' eintragen.")
                 return
-            values[field_cfg.field_id] = typed_value if raw_value != "" else ""
+            values[field_cfg.field_id] = typed_value  # coerce_value liefert für leere Eingaben bereits ""
 
         # Speichere aktuelle Werte aus wiederholbaren Messungen
-        self._save_repeated_measurement_values(step)
-
-        notes_text = self.notes_text.get("1.0", "end-1c").strip()
-        completed_at = datetime.now()
-        duration = completed_at - self.current_step_started_at if self.current_step_started_at else None
+        self._save_repeated_measurement_values()
+
+        notes_text = self.notes_text.get("1.0", "end-1c")
+        # strip() nur, wenn am Rand wirklich Leerraum steht (spart die Kopie im Normalfall)
+        if notes_text and (notes_text[0].isspace() or notes_text[-1].isspace()):
+            notes_text = notes_text.strip()
+        completed_at_ns = time.time_ns()
+        started_at_ns = self.current_step_started_at_ns
+        # Der Arbeitsstand wird direkt übergeben und danach ersetzt; kopiert wird nur beim Betreten (_load_step_state)
+        snapshot = self.step_state
+        self.step_state = StepState()
         result = StepResult(
             config=step,
-            started_at=self.current_step_started_at,
-            completed_at=completed_at,
-            duration=duration,
+            started_at_ns=started_at_ns,
+            completed_at_ns=completed_at_ns,
+            duration_ns=completed_at_ns - started_at_ns if started_at_ns is not None else None,
             values=values,
             notes=notes_text,
-            otbiolab_paths=list(self.current_step_otbiolab_paths),  # Liste kopieren (legacy)
-            field_otbiolab_files={k: list(v) for k, v in self.current_step_field_otbiolab_files.items()},  # Deep copy
-            repeated_measurements={k: [dict(attempt) for attempt in v] for k, v in self.current_step_repeated_measurements.items()},  # Deep copy
+            otbiolab_paths=snapshot.otbiolab_paths,
+            field_otbiolab_files=snapshot.field_otbiolab_files,
+            repeated_measurements=snapshot.repeated_measurements,
         )
 
-        if len(self.step_results) > self.current_step_index:
-            self.step_results[self.current_step_index] = result
-        else:
-            self.step_results.append(result)
+        self.step_results[self.current_step_index] = result
 
         if self.current_step_index + 1 < len(self.declaration.steps):
             self.current_step_index += 1
-            self.current_step_started_at = datetime.now()
-            self.current_step_otbiolab_paths = []  # Liste für nächsten Schritt zurücksetzen (legacy)
-            self.current_step_field_otbiolab_files = {}  # Dictionary für nächsten Schritt zurücksetzen
-            self.current_step_repeated_measurements = {}  # Dictionary für nächsten Schritt zurücksetzen
+            self.current_step_started_at_ns = completed_at_ns  # Ende des einen = Start des nächsten Schritts
+            self._step_t0 = time.monotonic()
+            self._load_step_state()
             self._show_current_step()
         else:
             self._finish_session()
@@ -1190,141 +2041,162 @@ class SessionApp(tk.Tk):
         if self.current_step_index <= 0:
             return
         self.current_step_index -= 1
-        self.current_step_started_at = datetime.now()
+        self.current_step_started_at_ns = time.time_ns()
+        self._step_t0 = time.monotonic()
+        self._load_step_state()
         self._show_current_step()
 
+    def _load_step_state(self) -> None:
+        """Arbeitsstand beim Betreten eines Schritts: Kopie eines vorhandenen Ergebnisses, sonst leer."""
+        existing = self.step_results[self.current_step_index]
+        self.step_state = StepState.from_result(existing) if existing else StepState()
+
     def _finish_session(self) -> None:
         if self._timer_after_id:
             self.after_cancel(self._timer_after_id)
             self._timer_after_id = None
         self._stop_reminders()  # Stoppe Erinnerungs-Timer
-        total_duration = datetime.now() - self.session_started_at if self.session_started_at else None
-        protocol_text = self._build_protocol_text(total_duration)
-        self.summary_text.configure(state="normal")
-        self.summary_text.delete("1.0", "end")
-        self.summary_text.insert("1.0", protocol_text)
-        self.summary_text.configure(state="disabled")
+        self._ensure_frame("summary")
+        # Ein Zeitstempel für das ganze Abschluss-Ereignis: Ende, Gesamtdauer und JSON stimmen überein
+        session_end = datetime.now()
+        total_duration = session_end - self.session_started_at if self.session_started_at else None
+        protocol_text = self._build_protocol_text(total_duration, session_end)
+        self._set_summary_text(protocol_text)
         pid = self.metadata_values.get("pid", "unbekannt")
         info_lines = [
             f"PID: {pid}",
             f"Dauer gesamt: {seconds_to_clock(total_duration.total_seconds()) if total_duration else 'n/a'}",
-            f"Schritte dokumentiert: {len(self.step_results)}",
+            f"Schritte dokumentiert: {len(self._completed_results())}",
         ]
         self.summary_info_var.set("\n".join(info_lines))
         self.session_finished = True
 
         # Automatisches Speichern des Protokolls und der Referenz-Datei
         self._auto_save_protocol(protocol_text)
-        self._auto_save_protocol_json()
+        self._auto_save_protocol_json(session_end)
         self._save_reference_file()
 
         self._show_frame("summary")
 
-    def _build_protocol_text(self, total_duration: Optional[timedelta]) -> str:
+    def _build_protocol_text(self, total_duration: Optional[timedelta], session_end: Optional[datetime] = None) -> str:
         lines: List[str] = []
+        add = lines.append
         session_time = self.session_started_at.isoformat(sep=" ", timespec="seconds") if self.session_started_at else "-"
-        lines.append("=" * 70)
-        lines.append("HDsEMG VERSUCHSREIHE PROTOKOLL")
-        lines.append("=" * 70)
-        lines.append(f"Session gestartet: {session_time}")
-        session_end_time = datetime.now().isoformat(sep=" ", timespec="seconds")
-        lines.append(f"Session beendet:   {session_end_time}")
+        add(PROTOCOL_RULE)
+        add("HDsEMG VERSUCHSREIHE PROTOKOLL")
+        add(PROTOCOL_RULE)
+        add(f"Session gestartet: {session_time}")
+        session_end_time = (session_end or datetime.now()).isoformat(sep=" ", timespec="seconds")
+        add(f"Session beendet:   {session_end_time}")
         if total_duration:
-            lines.append(f"Gesamtdauer:       {seconds_to_clock(total_duration.total_seconds())}")
-        lines.append("")
-        lines.append("Metadaten:")
-        lines.append("-" * 70)
+            add(f"Gesamtdauer:       {seconds_to_clock(total_duration.total_seconds())}")
+        add("")
+        add("Metadaten:")
+        add(PROTOCOL_SUBRULE)
         for key, value in self.metadata_values.items():
-            lines.append(f"  {key}: {value}")
-        lines.append("")
-        lines.append("Schritte:")
-        lines.append("=" * 70)
-        for idx, result in enumerate(self.step_results, start=1):
-            lines.append("")
-            lines.append(f"[Schritt {idx}] {result.config.title} ({result.config.step_id})")
-            lines.append("-" * 70)
-            if result.started_at:
-                lines.append(f"    ⏱ Start:      {result.started_at.strftime('%Y-%m-%d %H:%M:%S')}")
-            if result.completed_at:
-                lines.append(f"    ⏱ Ende:       {result.completed_at.strftime('%Y-%m-%d %H:%M:%S')}")
-                lines.append(f"    ✓ Weiter gedrückt um: {result.completed_at.strftime('%H:%M:%S')}")
-            if result.duration:
-                lines.append(f"    ⌛ Dauer:      {seconds_to_clock(result.duration.total_seconds())}")
+            add(f"  {key}: {value}")
+        add("")
+        add("Schritte:")
+        add(PROTOCOL_RULE)
+        for idx, result in enumerate(self._completed_results(), start=1):
+            step_config = result.config
+            add("")
+            add(f"[Schritt {idx}] {result.config.title} ({result.config.step_id})")
+            add(PROTOCOL_SUBRULE)
+            if result.started_at_ns:
+                add(f"    ⏱ Start:      {ns_to_datetime(result.started_at_ns).strftime(PROTOCOL_DATETIME_FORMAT)}")
+            if result.completed_at_ns:
+                completed = ns_to_datetime(result.completed_at_ns).strftime(PROTOCOL_DATETIME_FORMAT)
+                add(f"    ⏱ Ende:       {completed}")
+                add(f"    ✓ Weiter gedrückt um: {completed[11:]}")  # nur HH:MM:SS
+            if result.duration_ns:
+                add(f"    ⌛ Dauer:      {seconds_to_clock(result.duration_ns // 1_000_000_000)}")
             if result.config.expected_duration_seconds:
-                lines.append(f"    📋 Erwartet:   {seconds_to_clock(result.config.expected_duration_seconds)}")
+                add(f"    📋 Erwartet:   {seconds_to_clock(result.config.expected_duration_seconds)}")
             if result.values:
-                lines.append("")
-                lines.append("    Eingaben:")
-                for field_cfg in result.config.fields:
-                    if field_cfg.repeated_measurement:
-                        # Überspringe - wiederholbare Messungen werden separat ausgegeben
-                        continue
-
-                    value = result.values.get(field_cfg.field_id, "")
-                    lines.append(f"      • {field_cfg.label}: {value}")
+                add("")
+                add("    Eingaben:")
+                values_get = result.values.get
+                files_get = result.field_otbiolab_files.get
+                # Wiederholbare Messungen werden separat ausgegeben
+                for field_cfg in step_config.plain_fields:
+                    field_id = field_cfg.field_id
+                    add(f"      • {field_cfg.label}: {values_get(field_id, '')}")
 
                     # Zeige OTBioLab-Dateien für dieses Feld (falls vorhanden)
-                    if field_cfg.field_id in result.field_otbiolab_files:
-                        field_files = result.field_otbiolab_files[field_cfg.field_id]
-                        if field_files:
-                            if len(field_files) == 1:
-                                lines.append(f"        💾 OTBioLab: {field_files[0]}")
-                            else:
-                                lines.append(f"        💾 OTBioLab-Dateien ({len(field_files)}):")
-                                for i, otb_path in enumerate(field_files, start=1):
-                                    lines.append(f"           {i}. {otb_path}")
+                    field_files = files_get(field_id)
+                    if field_files:
+                        if len(field_files) == 1:
+                            add(f"        💾 OTBioLab: {field_files[0]}")
+                        else:
+                            add(f"        💾 OTBioLab-Dateien ({len(field_files)}):")
+                            for i, otb_path in enumerate(field_files, start=1):
+                                add(f"           {i}. {otb_path}")
 
             # Zeige wiederholbare Messungen
             if result.repeated_measurements:
-                lines.append("")
-                lines.append("    Wiederholbare Messungen:")
-                for field_cfg in result.config.fields:
-                    if not field_cfg.repeated_measurement:
-                        continue
-
-                    if field_cfg.field_id not in result.repeated_measurements:
-                        continue
-
-                    attempts = result.repeated_measurements[field_cfg.field_id]
+                add("")
+                add("    Wiederholbare Messungen:")
+                measurements_get = result.repeated_measurements.get
+                for field_cfg in step_config.repeated_measurement_fields:
+                    attempts = measurements_get(field_cfg.field_id)
                     if not attempts:
                         continue
 
-                    lines.append(f"      ▸ {field_cfg.label}:")
+                    add(f"      ▸ {field_cfg.label}:")
                     for attempt_idx, attempt_data in enumerate(attempts, start=1):
                         # Zeige Dateiname direkt nach Versuch-Nummer (falls vorhanden)
                         if "otbiolab_file" in attempt_data:
-                            filename = Path(attempt_data['otbiolab_file']).name
-                            lines.append(f"        Versuch {attempt_idx}: ({filename})")
+                            filename = attempt_file_name(attempt_data)
+                            add(f"        Versuch {attempt_idx}: ({filename})")
                         else:
-                            lines.append(f"        Versuch {attempt_idx}:")
+                            add(f"        Versuch {attempt_idx}:")
 
                         for sub_field_cfg in field_cfg.repeated_fields:
                             sub_value = attempt_data.get(sub_field_cfg.field_id, "")
-                            lines.append(f"          • {sub_field_cfg.label}: {sub_value}")
+                            add(f"          • {sub_field_cfg.label}: {sub_value}")
 
             if result.notes:
-                lines.append("")
-                lines.append(f"    📝 Notizen:")
-                for line in result.notes.split("\n"):
-                    lines.append(f"       {line}")
+                add("")
+                add(f"    📝 Notizen:")
+                # Eine Zeile mit eingebetteten Umbrüchen; das spätere "\n".join ergibt dieselbe Ausgabe
+                add("       " + result.notes.replace("\n", "\n       "))
 
             # Schritt-basierte OTBioLab-Dateien (legacy)
             if result.otbiolab_paths:
-                lines.append("")
+                add("")
                 if len(result.otbiolab_paths) == 1:
-                    lines.append(f"    💾 OTBioLab-Datei (Schritt): {result.otbiolab_paths[0]}")
+                    add(f"    💾 OTBioLab-Datei (Schritt): {result.otbiolab_paths[0]}")
                 else:
-                    lines.append(f"    💾 OTBioLab-Dateien (Schritt, {len(result.otbiolab_paths)}):")
+                    add(f"    💾 OTBioLab-Dateien (Schritt, {len(result.otbiolab_paths)}):")
                     for i, otb_path in enumerate(result.otbiolab_paths, start=1):
-                        lines.append(f"       {i}. {otb_path}")
+                        add(f"       {i}. {otb_path}")
 
-            lines.append("")
-        lines.append("=" * 70)
-        lines.append("Ende des Protokolls")
-        lines.append("=" * 70)
+            add("")
+        add(PROTOCOL_RULE)
+        add("Ende des Protokolls")
+        add(PROTOCOL_RULE)
         return "\n".join(lines)
 
     # OTBioLab Integration -------------------------------------------------------
+    def _post_to_ui(self, callback: Callable[..., None], *args: Any) -> None:
+        """Reicht ein Ergebnis aus einem Hintergrundthread an den UI-Thread weiter."""
+        self._ui_events.put((callback, args))
+        try:
+            self.event_generate("<<UiEvent>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            pass  # Fenster wird gerade geschlossen
+
+    def _drain_ui_events(self, event: tk.Event) -> None:
+        # Ein Event kann mehrere Einträge abholen; spätere Events finden dann eine leere Queue vor
+        events = self._ui_events
+        while True:
+            try:
+                callback, args = events.get_nowait()
+            except queue.Empty:
+                return
+            callback(*args)
+
     def _trigger_otbiolab_save(self) -> None:
         if not self.declaration or not self.output_dir:
             return
@@ -1338,18 +2210,20 @@ class SessionApp(tk.Tk):
 
         context = self._build_template_context(step)
         try:
-            filename = step.otbiolab_template.format(**context)
+            filename = render_template(step.otbiolab_template, step.otbiolab_template_parts, context)
         except KeyError as exc:
             messagebox.showerror("Template Fehler", f"Platzhalter {exc} konnte nicht gefüllt werden.")
             return
         if not filename.lower().endswith(".otb4"):
             filename += ".otb4"
-        target_path = (self.output_dir / filename).resolve()
+        target_path = self._output_path(filename)
         target_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self._ensure_otbiolab_program():
+            return
 
         self.status_var.set(f"Übergebe Dateiname an OTBioLab… ({target_path.name})")
-        self.trigger_button.configure(state="disabled")
-        self.next_button.configure(state="disabled")
+        self._set_state(self.trigger_button, "disabled")
+        self._set_state(self.next_button, "disabled")
 
         # Hintergrundthread, damit die UI flüssig bleibt.
         def worker() -> None:
@@ -1359,22 +2233,16 @@ class SessionApp(tk.Tk):
             except Exception as exc:
                 success = False
                 message = f"Fehler beim Zugriff auf den Speichern-Dialog: {exc}"
-            self.after(0, lambda: self._on_interceptor_finished(success, message, target_path))
+            self._post_to_ui(self._on_interceptor_finished, success, message, target_path)
 
-        threading.Thread(target=worker, daemon=True).start()
+        self._otbiolab_worker.submit(worker)
 
     def _trigger_field_otbiolab_save(self, field_id: str) -> None:
         """Übergebe OTBioLab-Dateiname für ein spezifisches Feld."""
         if not self.declaration or not self.output_dir:
             return
         step = self.declaration.steps[self.current_step_index]
-
-        # Finde das Feld
-        field_cfg = None
-        for f in step.fields:
-            if f.field_id == field_id:
-                field_cfg = f
-                break
+        field_cfg = step.fields_by_id.get(field_id)
 
         if not field_cfg or not field_cfg.otbiolab_template:
             messagebox.showinfo("Kein Dateiname", "Dieses Feld hat keine OTBioLab-Datei-Vorlage.")
@@ -1390,19 +2258,21 @@ class SessionApp(tk.Tk):
         context["field_label"] = field_cfg.label
 
         # Zähle bereits vorhandene Dateien für dieses Feld
-        existing_count = len(self.current_step_field_otbiolab_files.get(field_id, []))
+        existing_count = len(self.step_state.field_otbiolab_files.get(field_id, []))
         context["file_number"] = existing_count + 1
 
         try:
-            filename = field_cfg.otbiolab_template.format(**context)
+            filename = render_template(field_cfg.otbiolab_template, field_cfg.otbiolab_template_parts, context)
         except KeyError as exc:
             messagebox.showerror("Template Fehler", f"Platzhalter {exc} konnte nicht gefüllt werden.")
             return
 
         if not filename.lower().endswith(".otb4"):
             filename += ".otb4"
-        target_path = (self.output_dir / filename).resolve()
+        target_path = self._output_path(filename)
         target_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self._ensure_otbiolab_program():
+            return
 
         self.status_var.set(f"Übergebe Dateiname für '{field_cfg.label}' an OTBioLab… ({target_path.name})")
 
@@ -1414,29 +2284,52 @@ class SessionApp(tk.Tk):
             except Exception as exc:
                 success = False
                 message = f"Fehler beim Zugriff auf den Speichern-Dialog: {exc}"
-            self.after(0, lambda: self._on_field_interceptor_finished(success, message, target_path, field_id))
+            self._post_to_ui(self._on_field_interceptor_finished, success, message, target_path, field_id)
+
+        self._otbiolab_worker.submit(worker)
+
+    def _ensure_otbiolab_program(self) -> bool:
+        """Programmauswahl für den Speichern-Dialog im UI-Thread klären (Dialog als Toplevel der App),
+        damit der Hintergrundthread nur noch die gespeicherte Auswahl liest."""
+        if ensure_save_dialog_config(parent=self) is not None:
+            return True
+        self.status_var.set("Kein Programm für den OTBioLab Speichern-Dialog ausgewählt.")
+        return False
+
+    def _output_path(self, filename: str) -> Path:
+        """Zielpfad im Ausgabeordner; output_dir ist bereits aufgelöst, daher nur lexikalisch normalisieren (ohne stat)."""
+        return Path(os.path.normpath(self.output_dir / filename))
 
-        threading.Thread(target=worker, daemon=True).start()
+    def _completed_results(self) -> List[StepResult]:
+        """Abgeschlossene Schritte in Reihenfolge (Schritte werden nur der Reihe nach abgeschlossen)."""
+        return [result for result in self.step_results if result is not None]
 
     def _build_template_context(self, step: StepConfig) -> Dict[str, Any]:
-        context = dict(self.metadata_values)
-        context["pid"] = context.get("pid", "PID")
-        context["step_id"] = step.step_id
-        context["step_title"] = step.title
-        context["step_index"] = self.current_step_index + 1
-        context["timestamp"] = datetime.now().strftime("%Y%m%d_%H%M%S")
-        context["session_timestamp"] = self.session_timestamp or context["timestamp"]
+        cached = self._step_context_base
+        if cached is None or cached[0] is not step:
+            # Metadaten ändern sich nur beim Session-Start, Schrittangaben nur beim Schrittwechsel
+            base = dict(self.metadata_values)
+            base["pid"] = base.get("pid", "PID")
+            base["step_id"] = step.step_id
+            base["step_title"] = step.title
+            base["step_index"] = self.current_step_index + 1
+            cached = self._step_context_base = (step, base)
+        context = cached[1].copy()
+        # Zeitstempel bleibt pro Aufruf: mehrere Dateien eines Schritts dürfen nicht denselben Namen bekommen
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        context["timestamp"] = timestamp
+        context["session_timestamp"] = self.session_timestamp or timestamp
         return context
 
     def _on_interceptor_finished(self, success: bool, message: str, path: Path) -> None:
-        self.trigger_button.configure(state="normal")
-        self.next_button.configure(state="normal")
+        self._set_state(self.trigger_button, "normal")
+        self._set_state(self.next_button, "normal")
         self.status_var.set(message)
         if success:
             # Füge Pfad zur Liste hinzu
-            self.current_step_otbiolab_paths.append(str(path))
+            self.step_state.otbiolab_paths.append(str(path))
             # Zeige Anzahl der übergebenen Dateien an
-            count = len(self.current_step_otbiolab_paths)
+            count = len(self.step_state.otbiolab_paths)
             self.status_var.set(f"{message} ({count} Datei{'en' if count != 1 else ''} für diesen Schritt)")
 
     def _on_field_interceptor_finished(self, success: bool, message: str, path: Path, field_id: str) -> None:
@@ -1444,32 +2337,18 @@ class SessionApp(tk.Tk):
         self.status_var.set(message)
         if success:
             # Füge Pfad zur Feld-spezifischen Liste hinzu
-            if field_id not in self.current_step_field_otbiolab_files:
-                self.current_step_field_otbiolab_files[field_id] = []
-            self.current_step_field_otbiolab_files[field_id].append(str(path))
+            field_files = self.step_state.field_otbiolab_files.setdefault(field_id, [])
+            field_files.append(str(path))
 
             # Zeige Anzahl der übergebenen Dateien für dieses Feld
-            count = len(self.current_step_field_otbiolab_files[field_id])
+            count = len(field_files)
             self.status_var.set(f"{message} ({count} Datei{'en' if count != 1 else ''} für dieses Feld)")
 
-            # Speichere aktuelle Werte vor UI-Update
-            if not self.declaration:
-                return
-            step = self.declaration.steps[self.current_step_index]
-            current_values = {}
-            for field_cfg in step.fields:
-                control = self.step_controls.get(field_cfg.field_id)
-                if control:
-                    current_values[field_cfg.field_id] = control.get_value()
-
-            # Aktualisiere die UI, um die Anzahl neben dem Button anzuzeigen
-            self._show_current_step()
-
-            # Stelle gespeicherte Werte wieder her
-            for field_cfg in step.fields:
-                control = self.step_controls.get(field_cfg.field_id)
-                if control and field_cfg.field_id in current_values:
-                    control.set_value(current_values[field_cfg.field_id])
+            # Nur die Anzahl neben dem Button aktualisieren; eingegebene Werte bleiben unangetastet
+            field_row = self.step_field_rows.get(field_id)
+            if field_row is not None and field_row.button_frame is not None:
+                row = int(field_row.button_frame.grid_info()["row"])
+                self._show_field_file_count(field_row, row, field_id)
 
     # Dateinamen kopieren --------------------------------------------------------
     def _copy_step_filename(self) -> None:
@@ -1482,19 +2361,19 @@ class SessionApp(tk.Tk):
 
         context = self._build_template_context(step)
         try:
-            filename = step.otbiolab_template.format(**context)
+            filename = render_template(step.otbiolab_template, step.otbiolab_template_parts, context)
         except KeyError as exc:
             messagebox.showerror("Template Fehler", f"Platzhalter {exc} konnte nicht gefüllt werden.")
             return
 
         if not filename.lower().endswith(".otb4"):
             filename += ".otb4"
-        target_path = (self.output_dir / filename).resolve()
+        target_path = self._output_path(filename)
 
         # Kopiere in Zwischenablage
         self.clipboard_clear()
         self.clipboard_append(str(target_path))
-        self.update()
+        self.update_idletasks()
         self.status_var.set(f"✓ Dateiname kopiert: {filename}")
 
     def _copy_field_filename(self, field_id: str) -> None:
@@ -1502,13 +2381,7 @@ class SessionApp(tk.Tk):
         if not self.declaration or not self.output_dir:
             return
         step = self.declaration.steps[self.current_step_index]
-
-        # Finde das Feld
-        field_cfg = None
-        for f in step.fields:
-            if f.field_id == field_id:
-                field_cfg = f
-                break
+        field_cfg = step.fields_by_id.get(field_id)
 
         if not field_cfg or not field_cfg.otbiolab_template:
             return
@@ -1519,23 +2392,23 @@ class SessionApp(tk.Tk):
         context["field_label"] = field_cfg.label
 
         # Zähle bereits vorhandene Dateien für dieses Feld
-        existing_count = len(self.current_step_field_otbiolab_files.get(field_id, []))
+        existing_count = len(self.step_state.field_otbiolab_files.get(field_id, []))
         context["file_number"] = existing_count + 1
 
         try:
-            filename = field_cfg.otbiolab_template.format(**context)
+            filename = render_template(field_cfg.otbiolab_template, field_cfg.otbiolab_template_parts, context)
         except KeyError as exc:
             messagebox.showerror("Template Fehler", f"Platzhalter {exc} konnte nicht gefüllt werden.")
             return
 
         if not filename.lower().endswith(".otb4"):
             filename += ".otb4"
-        target_path = (self.output_dir / filename).resolve()
+        target_path = self._output_path(filename)
 
         # Kopiere in Zwischenablage
         self.clipboard_clear()
         self.clipboard_append(str(target_path))
-        self.update()
+        self.update_idletasks()
         self.status_var.set(f"✓ Dateiname kopiert: {filename}")
 
     def _copy_repeated_measurement_filename(self, field_id: str, attempt_idx: int) -> None:
@@ -1544,11 +2417,7 @@ class SessionApp(tk.Tk):
             return
 
         step = self.declaration.steps[self.current_step_index]
-        field_cfg = None
-        for f in step.fields:
-            if f.field_id == field_id:
-                field_cfg = f
-                break
+        field_cfg = step.fields_by_id.get(field_id)
 
         if not field_cfg or not field_cfg.otbiolab_template:
             return
@@ -1559,33 +2428,42 @@ class SessionApp(tk.Tk):
         context["attempt_number"] = attempt_idx + 1  # 1-based für Dateinamen
 
         try:
-            filename = field_cfg.otbiolab_template.format(**context)
+            filename = render_template(field_cfg.otbiolab_template, field_cfg.otbiolab_template_parts, context)
         except KeyError as exc:
             messagebox.showerror("Template Fehler", f"Platzhalter {exc} konnte nicht gefüllt werden.")
             return
 
         if not filename.lower().endswith(".otb4"):
             filename += ".otb4"
-        target_path = (self.output_dir / filename).resolve()
+        target_path = self._output_path(filename)
 
         # Kopiere in Zwischenablage
         self.clipboard_clear()
         self.clipboard_append(str(target_path))
-        self.update()
+        self.update_idletasks()
         self.status_var.set(f"✓ Dateiname für Versuch {attempt_idx + 1} kopiert: {filename}")
 
     # Zusammenfassung/Export ------------------------------------------------------
+    def _session_file_path(self, folder: str, suffix: str) -> Path:
+        """Pfad einer Session-Datei (PID und Zeitstempel ändern sich nach dem Start nicht, daher gecacht)."""
+        key = (folder, suffix)
+        path = self._session_paths.get(key)
+        if path is None:
+            pid = self.metadata_values.get("pid", "PID")
+            path = self._session_paths[key] = self.output_dir / folder / f"{pid}_{self.session_timestamp}_{suffix}"
+        return path
+
+    def _write_protocol_text(self, content: str) -> Path:
+        """Schreibt das Text-Protokoll (manueller Export und automatisches Speichern)."""
+        target_path = self._session_file_path("protokolle", "protokoll.txt")
+        write_file_bytes(target_path, encode_text_file(content))
+        return target_path
+
     def _export_protocol(self) -> None:
         if not self.output_dir:
             messagebox.showwarning("Kein Ordner", "Es wurde kein Zielordner ausgewählt.")
             return
-        protocol_dir = self.output_dir / "protokolle"
-        protocol_dir.mkdir(parents=True, exist_ok=True)
-        pid = self.metadata_values.get("pid", "PID")
-        filename = f"{pid}_{self.session_timestamp}_protokoll.txt"
-        target_path = protocol_dir / filename
-        content = self.summary_text.get("1.0", "end-1c")
-        target_path.write_text(content, encoding="utf-8")
+        target_path = self._write_protocol_text(self._summary_content)
         messagebox.showinfo("Protokoll gespeichert", f"Protokoll gespeichert unter:\n{target_path}")
 
     def _export_protocol_json(self) -> None:
@@ -1593,15 +2471,11 @@ class SessionApp(tk.Tk):
         if not self.output_dir:
             messagebox.showwarning("Kein Ordner", "Es wurde kein Zielordner ausgewählt.")
             return
-        protocol_dir = self.output_dir / "protokolle"
-        protocol_dir.mkdir(parents=True, exist_ok=True)
-        pid = self.metadata_values.get("pid", "PID")
-        filename = f"{pid}_{self.session_timestamp}_protokoll.json"
-        target_path = protocol_dir / filename
+        target_path = self._session_file_path("protokolle", "protokoll.json")
 
         try:
             protocol_json = self._build_protocol_json()
-            target_path.write_text(json.dumps(protocol_json, ensure_ascii=False, indent=2), encoding="utf-8")
+            write_file_bytes(target_path, json_dump_bytes(protocol_json))
             messagebox.showinfo("JSON-Protokoll gespeichert", f"JSON-Protokoll gespeichert unter:\n{target_path}")
         except Exception as exc:
             messagebox.showerror("Fehler", f"Fehler beim Speichern des JSON-Protokolls:\n{exc}")
@@ -1610,19 +2484,26 @@ class SessionApp(tk.Tk):
         if self._timer_after_id:
             self.after_cancel(self._timer_after_id)
             self._timer_after_id = None
+        if self._rebuild_pending is not None:
+            self.after_cancel(self._rebuild_pending)
+            self._rebuild_pending = None
         self.session_started_at = None
-        self.current_step_started_at = None
+        self._session_started_iso = None
+        self._session_paths.clear()
+        self.current_step_started_at_ns = None
+        self._session_t0 = None
+        self._step_t0 = None
         self.current_step_index = -1
         self.step_results = []
-        self.current_step_otbiolab_paths = []
-        self.current_step_field_otbiolab_files = {}
+        self.step_state = StepState()
         self.metadata_values = {}
+        self._step_context_base = None
         self.session_finished = False
         self.total_timer_var.set("00:00:00")
         self.step_timer_var.set("00:00:00")
-        self.summary_text.configure(state="normal")
-        self.summary_text.delete("1.0", "end")
-        self.summary_text.configure(state="disabled")
+        self._last_total_text = ""
+        self._last_step_text = ""
+        self._set_summary_text("")
         self.summary_info_var.set("")
         for control in self.metadata_controls.values():
             control.set_value("")
@@ -1632,7 +2513,9 @@ class SessionApp(tk.Tk):
     # Referenz-File Methods -------------------------------------------------------
     def _load_reference_file(self) -> None:
         """Lädt eine Referenz-Datei und füllt Felder mit use_from_ref=true aus."""
-        initial_dir = str(self.output_dir.resolve()) if self.output_dir else str(ROOT_DIR)
+        from tkinter import filedialog
+
+        initial_dir = str(self.output_dir) if self.output_dir else str(ROOT_DIR)
         path_str = filedialog.askopenfilename(
             parent=self,
             title="Referenz-Datei auswählen",
@@ -1644,14 +2527,19 @@ class SessionApp(tk.Tk):
 
         try:
             path = Path(path_str)
-            data = json.loads(path.read_text(encoding="utf-8"))
+            data = load_reference_data(path)
 
             # Validierung
             if "metadata" not in data:
                 messagebox.showerror("Fehler", "Ungültige Referenz-Datei: 'metadata' fehlt.")
                 return
 
+            ref_values_by_step = {
+                step_id: ref_step.get("values", {})
+                for step_id, ref_step in data.get("steps", {}).items()
+            }
             self.reference_data = data
+            self._ref_values_by_step = ref_values_by_step
             self.reference_file_var.set(str(path))
 
             # Felder mit use_from_ref=true automatisch ausfüllen
@@ -1668,13 +2556,15 @@ class SessionApp(tk.Tk):
 
         ref_metadata = self.reference_data.get("metadata", {})
 
-        # Wende auf Metadata-Felder an
-        for field_cfg in self.declaration.metadata_fields:
-            if field_cfg.use_from_ref and field_cfg.field_id in ref_metadata:
-                control = self.metadata_controls.get(field_cfg.field_id)
+        # Wende auf Metadata-Felder an (nur die beim Laden vorgemerkten use_from_ref-Felder)
+        get_control = self.metadata_controls.get
+        for field_id in self.declaration.ref_metadata_field_ids:
+            if field_id in ref_metadata:
+                control = get_control(field_id)
                 if control:
-                    control.set_value(ref_metadata[field_cfg.field_id])
-                    print(f"DEBUG: Referenz-Wert übernommen für '{field_cfg.field_id}': {ref_metadata[field_cfg.field_id]}")
+                    value = ref_metadata[field_id]
+                    control.set_value(value)
+                    log.debug("Referenz-Wert übernommen für %r: %r", field_id, value)
 
     def _save_reference_file(self) -> None:
         """Speichert Session-Daten als Referenz-File (wird beim Session-Ende aufgerufen)."""
@@ -1682,62 +2572,55 @@ class SessionApp(tk.Tk):
             return
 
         try:
-            ref_dir = self.output_dir / "referenzen"
-            ref_dir.mkdir(parents=True, exist_ok=True)
+            target_path = self._session_file_path("referenzen", "referenz.json")
 
-            pid = self.metadata_values.get("pid", "PID")
-            filename = f"{pid}_{self.session_timestamp}_referenz.json"
-            target_path = ref_dir / filename
-
-            # Sammle Schritt-Daten
-            steps_data = {}
-            for result in self.step_results:
-                steps_data[result.config.step_id] = {
-                    "values": dict(result.values),
-                    "notes": result.notes,
-                }
+            # Sammle Schritt-Daten (ohne Kopien – die Serialisierung verändert nichts)
+            steps_data = {
+                result.config.step_id: {"values": result.values, "notes": result.notes}
+                for result in self._completed_results()
+            }
 
             # Erstelle Referenz-Daten-Struktur
             ref_data = {
                 "session_timestamp": self.session_timestamp,
-                "session_started_at": self.session_started_at.isoformat() if self.session_started_at else None,
-                "metadata": dict(self.metadata_values),
+                "session_started_at": self._session_started_iso,
+                "metadata": self.metadata_values,
                 "steps": steps_data,
                 "declaration_title": self.declaration.title if self.declaration else None,
             }
 
-            target_path.write_text(json.dumps(ref_data, ensure_ascii=False, indent=2), encoding="utf-8")
-            print(f"INFO: Referenz-Datei gespeichert: {target_path}")
+            write_file_bytes(target_path, json_dump_bytes(ref_data))
+            log.info("Referenz-Datei gespeichert: %s", target_path)
         except Exception as exc:
-            print(f"FEHLER: Speichern der Referenz-Datei fehlgeschlagen: {exc}")
+            self._report_save_failure("Die Referenz-Datei", exc)
 
     # Utility Methods -------------------------------------------------------------
     def _auto_save_protocol(self, protocol_text: str) -> None:
         """Automatisches Speichern des Protokolls nach Messungsabschluss."""
         if not self.output_dir:
-            print("WARNUNG: Kein Ausgabeordner gesetzt - Protokoll wird nicht automatisch gespeichert.")
+            log.warning("Kein Ausgabeordner gesetzt - Protokoll wird nicht automatisch gespeichert.")
             return
 
         try:
-            protocol_dir = self.output_dir / "protokolle"
-            protocol_dir.mkdir(parents=True, exist_ok=True)
-            pid = self.metadata_values.get("pid", "PID")
-            filename = f"{pid}_{self.session_timestamp}_protokoll.txt"
-            target_path = protocol_dir / filename
-            target_path.write_text(protocol_text, encoding="utf-8")
-            print(f"INFO: Protokoll automatisch gespeichert: {target_path}")
+            target_path = self._write_protocol_text(protocol_text)
+            log.info("Protokoll automatisch gespeichert: %s", target_path)
         except Exception as exc:
-            print(f"FEHLER: Automatisches Speichern des Protokolls fehlgeschlagen: {exc}")
+            self._report_save_failure("Das Protokoll", exc)
+
+    def _report_save_failure(self, what: str, exc: Exception) -> None:
+        """Fehlgeschlagenes automatisches Speichern protokollieren (mit Traceback) und anzeigen."""
+        log.error("Speichern fehlgeschlagen: %s", what, exc_info=exc)
+        messagebox.showerror("Speichern fehlgeschlagen", f"{what} konnte nicht gespeichert werden:\n{exc}")
 
-    def _build_protocol_json(self) -> Dict[str, Any]:
+    def _build_protocol_json(self, session_end: Optional[datetime] = None) -> Dict[str, Any]:
         """Erstellt das Protokoll als JSON-Struktur."""
-        session_end_time = datetime.now()
+        session_end_time = session_end or datetime.now()
         total_duration = session_end_time - self.session_started_at if self.session_started_at else None
 
         protocol_data = {
             "protocol_version": "1.0",
             "session": {
-                "started_at": self.session_started_at.isoformat() if self.session_started_at else None,
+                "started_at": self._session_started_iso,
                 "ended_at": session_end_time.isoformat(),
                 "duration_seconds": total_duration.total_seconds() if total_duration else None,
                 "duration_formatted": seconds_to_clock(total_duration.total_seconds()) if total_duration else None,
@@ -1754,16 +2637,16 @@ class SessionApp(tk.Tk):
         }
 
         # Sammle alle Schritt-Daten
-        for idx, result in enumerate(self.step_results, start=1):
+        for idx, result in enumerate(self._completed_results(), start=1):
             step_data = {
                 "step_number": idx,
                 "step_id": result.config.step_id,
                 "title": result.config.title,
                 "description": result.config.description,
-                "started_at": result.started_at.isoformat() if result.started_at else None,
-                "completed_at": result.completed_at.isoformat() if result.completed_at else None,
-                "duration_seconds": result.duration.total_seconds() if result.duration else None,
-                "duration_formatted": seconds_to_clock(result.duration.total_seconds()) if result.duration else None,
+                "started_at": ns_to_datetime(result.started_at_ns).isoformat() if result.started_at_ns else None,
+                "completed_at": ns_to_datetime(result.completed_at_ns).isoformat() if result.completed_at_ns else None,
+                "duration_seconds": result.duration_ns // 1000 / 1e6 if result.duration_ns else None,
+                "duration_formatted": seconds_to_clock(result.duration_ns // 1_000_000_000) if result.duration_ns else None,
                 "expected_duration_seconds": result.config.expected_duration_seconds,
                 "expected_duration_formatted": seconds_to_clock(result.config.expected_duration_seconds) if result.config.expected_duration_seconds else None,
                 "fields": {},
@@ -1776,18 +2659,17 @@ class SessionApp(tk.Tk):
             }
 
             # Normale Felder
-            for field_cfg in result.config.fields:
-                if not field_cfg.repeated_measurement:
-                    step_data["fields"][field_cfg.field_id] = {
-                        "label": field_cfg.label,
-                        "value": result.values.get(field_cfg.field_id, ""),
-                        "type": field_cfg.kind,
-                        "otbiolab_files": result.field_otbiolab_files.get(field_cfg.field_id, [])
-                    }
+            for field_cfg in result.config.plain_fields:
+                step_data["fields"][field_cfg.field_id] = {
+                    "label": field_cfg.label,
+                    "value": result.values.get(field_cfg.field_id, ""),
+                    "type": field_cfg.kind,
+                    "otbiolab_files": result.field_otbiolab_files.get(field_cfg.field_id, [])
+                }
 
             # Wiederholbare Messungen
-            for field_cfg in result.config.fields:
-                if field_cfg.repeated_measurement and field_cfg.field_id in result.repeated_measurements:
+            for field_cfg in result.config.repeated_measurement_fields:
+                if field_cfg.field_id in result.repeated_measurements:
                     attempts = result.repeated_measurements[field_cfg.field_id]
                     step_data["repeated_measurements"][field_cfg.field_id] = {
                         "label": field_cfg.label,
@@ -1814,24 +2696,20 @@ class SessionApp(tk.Tk):
 
         return protocol_data
 
-    def _auto_save_protocol_json(self) -> None:
+    def _auto_save_protocol_json(self, session_end: Optional[datetime] = None) -> None:
         """Automatisches Speichern des Protokolls als JSON nach Messungsabschluss."""
         if not self.output_dir:
-            print("WARNUNG: Kein Ausgabeordner gesetzt - JSON-Protokoll wird nicht automatisch gespeichert.")
+            log.warning("Kein Ausgabeordner gesetzt - JSON-Protokoll wird nicht automatisch gespeichert.")
             return
 
         try:
-            protocol_dir = self.output_dir / "protokolle"
-            protocol_dir.mkdir(parents=True, exist_ok=True)
-            pid = self.metadata_values.get("pid", "PID")
-            filename = f"{pid}_{self.session_timestamp}_protokoll.json"
-            target_path = protocol_dir / filename
+            target_path = self._session_file_path("protokolle", "protokoll.json")
 
-            protocol_json = self._build_protocol_json()
-            target_path.write_text(json.dumps(protocol_json, ensure_ascii=False, indent=2), encoding="utf-8")
-            print(f"INFO: JSON-Protokoll automatisch gespeichert: {target_path}")
+            protocol_json = self._build_protocol_json(session_end)
+            write_file_bytes(target_path, json_dump_bytes(protocol_json))
+            log.info("JSON-Protokoll automatisch gespeichert: %s", target_path)
         except Exception as exc:
-            print(f"FEHLER: Automatisches Speichern des JSON-Protokolls fehlgeschlagen: {exc}")
+            self._report_save_failure("Das JSON-Protokoll", exc)
 
     def _on_closing(self) -> None:
         """Handle window close event - zeige Warnung wenn Messung läuft."""
@@ -1853,10 +2731,15 @@ class SessionApp(tk.Tk):
         if self._timer_after_id:
             self.after_cancel(self._timer_after_id)
         self._stop_reminders()  # Stoppe Erinnerungs-Timer
+        if self._folder_dialog is not None:
+            self._folder_dialog.close()
+        self._otbiolab_worker.close()
         self.destroy()
 
 
 def main() -> None:
+    # INFO-Meldungen (gespeicherte Dateien) wie bisher auf der Konsole ausgeben
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     app = SessionApp()
     app.mainloop()
 
@@ -1,22 +1,48 @@
+import ctypes
 import json
 import re
 import time
 import tkinter as tk
+from functools import lru_cache
 from pathlib import Path
 from tkinter import ttk
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from pywinauto import Desktop
 
 CONFIG_FILENAME = ".win_auto_program.json"
 
-
+# Einmal kompilierte Muster für die Dialogsuche (pywinauto nimmt kompilierte Muster als title_re an)
+_KEYWORD_SPLIT_RE = re.compile(r"\s*[-–—]\s*")
+_SAVE_TITLE_RE = re.compile(r"(Speichern|Save)", re.I)
+_CFD_TITLE_RE = re.compile(r"CFD File .* Window")
+_FILE_NAME_RE = re.compile(r".+\.\w+$")
+_SAVE_BUTTON_DE_RE = re.compile(r"^S&?peichern$")
+_SAVE_BUTTON_EN_RE = re.compile(r"^Save$")
+
+# Dialogsuche: spätestens nach POLL_INTERVAL erneut suchen, früher sobald der Zielprozess
+# ein Top-Level-Fenster einblendet (WinEvent-Hook, nur unter Windows)
+POLL_INTERVAL = 0.2
+UIA_FALLBACK_DELAY = 2.0  # Sekunden nur mit win32 suchen, bevor UIA zusätzlich abgefragt wird
+EVENT_OBJECT_SHOW = 0x8002
+OBJID_WINDOW = 0
+WINEVENT_OUTOFCONTEXT = 0x0000
+QS_ALLINPUT = 0x04FF
+PM_REMOVE = 0x0001
+GA_ROOT = 2
+
+# Gewählte Konfiguration; ändert sich nur über _save_config, daher nur einmal von der Platte lesen
+_cached_config: Optional[Dict[str, str]] = None
+
+
+@lru_cache(maxsize=1)
 def _config_path() -> Path:
+    # Das Arbeitsverzeichnis ändert sich zur Laufzeit der App nicht
     return Path.cwd() / CONFIG_FILENAME
 
 
 def _derive_keyword(title: str) -> str:
-    parts = [p.strip() for p in re.split(r"\s*[-–—]\s*", title) if p.strip()]
+    parts = [p.strip() for p in _KEYWORD_SPLIT_RE.split(title) if p.strip()]
     if parts:
         return parts[-1]
     return title.strip()
@@ -38,15 +64,21 @@ def _load_config() -> Optional[Dict[str, str]]:
 
 
 def _save_config(config: Dict[str, str]) -> None:
+    global _cached_config
     path = _config_path()
     path.write_text(json.dumps(config, ensure_ascii=True, indent=2), encoding="utf-8")
+    _cached_config = config
+
 
+def _show_window_selection_dialog(windows, parent=None):
+    """Zeigt einen grafischen Dialog zur Auswahl eines Fensters.
 
-def _show_window_selection_dialog(windows):
-    """Zeigt einen grafischen Dialog zur Auswahl eines Fensters."""
+    Mit `parent` wird ein Toplevel des vorhandenen Tk-Fensters verwendet statt eines zweiten
+    Tcl-Interpreters; das ist nur aus dem UI-Thread von `parent` heraus zulässig.
+    """
     result = [None]  # Mutable container für das Ergebnis
 
-    dialog = tk.Tk()
+    dialog = tk.Tk() if parent is None else tk.Toplevel(parent)
     dialog.title("OTBioLab Fenster auswählen")
     dialog.geometry("700x500")
     dialog.resizable(True, True)
@@ -77,10 +109,8 @@ def _show_window_selection_dialog(windows):
     listbox.pack(side="left", fill="both", expand=True)
     scrollbar.config(command=listbox.yview)
 
-    # Fenster zur Listbox hinzufügen
-    for idx, info in enumerate(windows):
-        display_text = f"{info['title']} (Klasse: {info['class_name']})"
-        listbox.insert(tk.END, display_text)
+    # Fenster zur Listbox hinzufügen (ein insert-Aufruf für alle Einträge)
+    listbox.insert(tk.END, *(f"{info['title']} (Klasse: {info['class_name']})" for info in windows))
 
     # Button-Frame
     button_frame = ttk.Frame(dialog)
@@ -106,14 +136,18 @@ def _show_window_selection_dialog(windows):
     listbox.bind("<Double-Button-1>", lambda e: on_select())
 
     # Dialog modal machen
-    dialog.transient()
-    dialog.grab_set()
-    dialog.mainloop()
+    if parent is None:
+        dialog.grab_set()
+        dialog.mainloop()
+    else:
+        dialog.transient(parent)
+        dialog.grab_set()
+        dialog.wait_window()
 
     return result[0]
 
 
-def _prompt_for_config() -> Optional[Dict[str, str]]:
+def _prompt_for_config(parent=None) -> Optional[Dict[str, str]]:
     windows = []
     seen = set()
     try:
@@ -124,11 +158,12 @@ def _prompt_for_config() -> Optional[Dict[str, str]]:
 
     for win in desktop.windows():
         try:
-            if not win.is_visible():
+            # Günstige Prüfungen zuerst: jede Abfrage ist ein Win32-Aufruf
+            class_name = (win.element_info.class_name or "").strip()
+            if not class_name:
                 continue
             title = win.window_text().strip()
-            class_name = (win.element_info.class_name or "").strip()
-            if not title or not class_name:
+            if not title or not win.is_visible():
                 continue
             key = (class_name.lower(), title.lower())
             if key in seen:
@@ -143,7 +178,7 @@ def _prompt_for_config() -> Optional[Dict[str, str]]:
         return None
 
     # Verwende GUI-Dialog statt Konsole
-    config = _show_window_selection_dialog(windows)
+    config = _show_window_selection_dialog(windows, parent)
     if config:
         print(
             f"Auswahl gespeichert: Klasse '{config['class_name']}', Schlüsselwort '{config['keyword']}'."
@@ -151,15 +186,23 @@ def _prompt_for_config() -> Optional[Dict[str, str]]:
     return config
 
 
-def _ensure_config() -> Optional[Dict[str, str]]:
+def ensure_config(parent=None) -> Optional[Dict[str, str]]:
+    """Liefert die gespeicherte Programmauswahl und fragt beim ersten Mal per Dialog nach.
+
+    Mit `parent` (nur aus dessen UI-Thread) öffnet sich die Auswahl als Toplevel der App.
+    """
+    global _cached_config
+    if _cached_config is not None:
+        return _cached_config
     config = _load_config()
     if config:
         print(
             f"Verwende gespeicherte Auswahl: Klasse '{config['class_name']}', "
             f"Schlüsselwort '{config['keyword']}'."
         )
+        _cached_config = config
         return config
-    config = _prompt_for_config()
+    config = _prompt_for_config(parent)
     if config:
         _save_config(config)
     return config
@@ -183,8 +226,161 @@ def _get_pid(config: Dict[str, str]) -> Optional[int]:
             continue
     return None
 
+def _process_windows(desktop, pid: int) -> List[Tuple[Any, str, str, str]]:
+    """Top-Level-Fenster von `pid` als (Fenster, Klasse, Control-Typ, Titel); jede Eigenschaft nur einmal abgefragt.
+
+    Den Control-Typ kennt nur das UIA-Backend, bei win32 bleibt er leer.
+    """
+    with_control_type = desktop.backend.name == "uia"
+    result = []
+    try:
+        candidates = desktop.windows(process=pid, visible_only=False)
+    except Exception:
+        return result
+    for w in candidates:
+        try:
+            ei = w.element_info
+            control_type = (ei.control_type or "") if with_control_type else ""
+            result.append((w, ei.class_name or "", control_type, w.window_text()))
+        except Exception:
+            continue
+    return result
+
+
+@lru_cache(maxsize=1)
+def _win32_api() -> Optional[Tuple[Any, Any, Any, Any]]:
+    """(user32, wintypes, WINEVENTPROC, WNDENUMPROC) mit gesetzten Prototypen; None ohne Windows."""
+    try:
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+    except (ImportError, AttributeError, OSError):
+        return None
+    winevent_proc = ctypes.WINFUNCTYPE(
+        None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG, wintypes.LONG,
+        wintypes.DWORD, wintypes.DWORD,
+    )
+    user32.SetWinEventHook.restype = wintypes.HANDLE
+    user32.SetWinEventHook.argtypes = (
+        wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, winevent_proc, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD,
+    )
+    user32.GetAncestor.restype = wintypes.HWND
+    user32.GetAncestor.argtypes = (wintypes.HWND, wintypes.UINT)
+    user32.FindWindowExW.restype = wintypes.HWND
+    user32.FindWindowExW.argtypes = (wintypes.HWND, wintypes.HWND, wintypes.LPCWSTR, wintypes.LPCWSTR)
+    user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+    user32.GetWindowThreadProcessId.argtypes = (wintypes.HWND, ctypes.POINTER(wintypes.DWORD))
+    user32.IsWindowVisible.restype = wintypes.BOOL
+    user32.IsWindowVisible.argtypes = (wintypes.HWND,)
+    wndenum_proc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    user32.EnumChildWindows.restype = wintypes.BOOL
+    user32.EnumChildWindows.argtypes = (wintypes.HWND, wndenum_proc, wintypes.LPARAM)
+    user32.GetWindowTextW.restype = ctypes.c_int
+    user32.GetWindowTextW.argtypes = (wintypes.HWND, wintypes.LPWSTR, ctypes.c_int)
+    user32.GetClassNameW.restype = ctypes.c_int
+    user32.GetClassNameW.argtypes = (wintypes.HWND, wintypes.LPWSTR, ctypes.c_int)
+    return user32, wintypes, winevent_proc, wndenum_proc
+
+
+def _find_dialog_hwnd(pid: int) -> Optional[int]:
+    """Sichtbarer Speichern-Dialog (#32770) von `pid`, direkt über FindWindowExW.
+
+    Auch Meldungsfenster sind #32770; gezählt wird nur ein Dialog mit Speichern/Save im Titel
+    oder mit einem Edit-Feld für den Dateinamen.
+    """
+    api = _win32_api()
+    if api is None:
+        return None
+    user32, wintypes, _, wndenum_proc = api
+    process_id = wintypes.DWORD()
+    buffer = ctypes.create_unicode_buffer(256)
+    hwnd = None
+    while True:
+        hwnd = user32.FindWindowExW(None, hwnd, "#32770", None)
+        if not hwnd:
+            return None
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(process_id))
+        if process_id.value != pid or not user32.IsWindowVisible(hwnd):
+            continue
+        user32.GetWindowTextW(hwnd, buffer, len(buffer))
+        if _SAVE_TITLE_RE.search(buffer.value) or _has_edit_child(user32, wndenum_proc, hwnd):
+            return hwnd
+
+
+def _has_edit_child(user32, wndenum_proc, hwnd) -> bool:
+    """True, wenn unter `hwnd` (beliebig tief) ein Edit-Control liegt."""
+    found = [False]
+    class_buffer = ctypes.create_unicode_buffer(32)
+
+    def on_child(child, _lparam):
+        user32.GetClassNameW(child, class_buffer, len(class_buffer))
+        if class_buffer.value == "Edit":
+            found[0] = True
+            return False  # Aufzählung abbrechen
+        return True
+
+    user32.EnumChildWindows(hwnd, wndenum_proc(on_child), 0)
+    return found[0]
+
+
+class _WindowShowWaiter:
+    """Wartet bis zu `timeout` Sekunden, kehrt aber zurück, sobald `pid` ein Top-Level-Fenster zeigt.
+
+    Der Hook gilt für den aufrufenden Thread; Ereignisse kommen nur beim Abholen der
+    Nachrichten in `wait` an. Ohne Hook (kein Windows) wird einfach geschlafen.
+    """
+
+    def __init__(self, pid: int):
+        self._hook = None
+        self._shown = False
+        api = _win32_api()
+        if api is None:
+            return
+        user32, wintypes, proc_type, _ = api
+
+        def on_event(hook, event, hwnd, id_object, id_child, thread_id, event_time):
+            if id_object == OBJID_WINDOW and hwnd and user32.GetAncestor(hwnd, GA_ROOT) == hwnd:
+                self._shown = True
+
+        self._callback = proc_type(on_event)  # Referenz halten, solange der Hook besteht
+        hook = user32.SetWinEventHook(
+            EVENT_OBJECT_SHOW, EVENT_OBJECT_SHOW, None, self._callback, pid, 0, WINEVENT_OUTOFCONTEXT
+        )
+        if hook:
+            self._hook = hook
+            self._user32 = user32
+            self._msg = wintypes.MSG()
+
+    def wait(self, timeout: float) -> None:
+        if self._hook is None:
+            time.sleep(timeout)
+            return
+        user32 = self._user32
+        msg_ref = ctypes.byref(self._msg)
+        deadline = time.monotonic() + timeout
+        self._shown = False
+        while not self._shown:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                return
+            user32.MsgWaitForMultipleObjects(0, None, False, remaining_ms, QS_ALLINPUT)
+            # WinEvent-Callbacks werden beim Abholen der Nachrichten ausgeführt
+            while user32.PeekMessageW(msg_ref, None, 0, 0, PM_REMOVE):
+                user32.TranslateMessage(msg_ref)
+                user32.DispatchMessageW(msg_ref)
+
+    def close(self) -> None:
+        if self._hook is not None:
+            self._user32.UnhookWinEvent(self._hook)
+            self._hook = None
+
+
 def save_in_word_dialog(path, timeout=20):
-    config = _ensure_config()
+    """Füllt den Speichern-Dialog des gewählten Programms mit `path` aus und bestätigt ihn.
+
+    Läuft meist in einem Hintergrundthread; die Fensterauswahl vorher mit `ensure_config(parent)`
+    im UI-Thread erledigen, sonst öffnet sie hier einen eigenen Tk-Interpreter.
+    """
+    config = ensure_config()
     if not config:
         print("Kein Programm ausgewählt. Vorgang abgebrochen.")
         return False
@@ -197,71 +393,92 @@ def save_in_word_dialog(path, timeout=20):
         )
         return False
 
+    # Desktop-Objekte einmal anlegen; pro Durchlauf wird je Backend nur einmal aufgezählt
+    desktops = {be: Desktop(backend=be) for be in ("uia", "win32")}
+
+    waiter = _WindowShowWaiter(pid)
+    try:
+        return _wait_and_fill(desktops, waiter, pid, path, timeout)
+    finally:
+        waiter.close()
+
+
+def _wait_and_fill(desktops, waiter: _WindowShowWaiter, pid: int, path, timeout) -> bool:
     t0 = time.time()
     while time.time() - t0 < timeout:
-        # 1) Versuche klassischen Dialog (#32770) dieses Prozesses
-        for be in ("uia","win32"):
-            d = Desktop(backend=be)
+        # win32 zählt günstig auf; das langsame UIA-Backend erst, wenn win32 eine Weile nichts findet
+        backends = ("win32", "uia") if time.time() - t0 >= UIA_FALLBACK_DELAY else ("win32",)
+
+        # 1) Klassischer Dialog (#32770) dieses Prozesses: zuerst direkt über die Win32-API,
+        #    erst danach über die (langsameren) pywinauto-Aufzählungen
+        hwnd = _find_dialog_hwnd(pid)
+        if hwnd:
             try:
-                dlg = d.window(class_name="#32770", process=pid)
-                if dlg.exists() and dlg.is_visible():
-                    print(f"[hit {be}] #32770")
-                    return _fill_and_save_win32(dlg, path)
+                print("[hit win32] #32770")
+                return _fill_and_save_win32(desktops["win32"].window(handle=hwnd), path)
             except Exception:
                 pass
 
-        # 2) UIA-Variante: Titel enthält Speichern/Save & gehört zum Zielprozess
+        windows = {be: _process_windows(desktops[be], pid) for be in backends}
+        # win32 deckt _find_dialog_hwnd bereits ab, sofern die API verfügbar ist
+        for be in (backends if _win32_api() is None else backends[1:]):
+            for w, class_name, _control_type, _title in windows[be]:
+                try:
+                    if class_name == "#32770" and w.is_visible():
+                        print(f"[hit {be}] #32770")
+                        return _fill_and_save_win32(desktops[be].window(handle=w.handle), path)
+                except Exception:
+                    pass
+
+        # 2) Fallback: CFD-Hilfsfenster → gehe einen Schritt nach oben
         try:
-            d = Desktop(backend="uia")
-            for w in d.windows():
-                ei = w.element_info
-                if (ei.process_id == pid and
-                    ei.control_type in ("Window","Pane") and
-                    re.search(r"(Speichern|Save)", w.window_text(), re.I)):
-                    print("[hit uia] title contains Speichern/Save")
-                    return _fill_and_save(w, path)
+            for w, _class_name, _control_type, title in windows["win32"]:
+                if _CFD_TITLE_RE.match(title):
+                    dlg = w.top_level_parent()
+                    if dlg.is_visible():
+                        print("[hit win32] via CFD parent")
+                        return _fill_and_save_win32(desktops["win32"].window(handle=dlg.handle), path)
         except Exception:
             pass
 
-        # 3) Fallback: CFD-Hilfsfenster → gehe einen Schritt nach oben
+        # 3) UIA-Variante: Titel enthält Speichern/Save & gehört zum Zielprozess
+        #    (die Aufzählung enthält auch unsichtbare Fenster, siehe _process_windows)
         try:
-            d = Desktop(backend="win32")
-            cfd = d.window(title_re="CFD File .* Window", process=pid)
-            if cfd.exists():
-                dlg = cfd.top_level_parent()
-                if dlg.exists() and dlg.is_visible():
-                    print("[hit win32] via CFD parent")
-                    return _fill_and_save(dlg, path)
+            for w, _class_name, control_type, title in windows.get("uia", ()):
+                if (control_type in ("Window", "Pane") and
+                        _SAVE_TITLE_RE.search(title) and w.is_visible()):
+                    print("[hit uia] title contains Speichern/Save")
+                    return _fill_and_save_win32(desktops["win32"].window(handle=w.handle), path)
         except Exception:
             pass
 
-        time.sleep(0.2)
+        waiter.wait(POLL_INTERVAL)
     return False
 
 def _fill_and_save_win32(dlg, path):
     # 1) Dateiname-Edit: hat i.d.R. einen nicht-leeren Titel wie "tmp.docx"
     try:
-        edit = dlg.child_window(class_name="Edit", title_re=r".+\.\w+$").wrapper_object()
+        edit = dlg.child_window(class_name="Edit", title_re=_FILE_NAME_RE).wrapper_object()
     except Exception:
         # Fallback: nimm das Edit innerhalb der ComboBox mit nicht-leerem Titel
-        combo = dlg.child_window(class_name="ComboBox", title_re=r".+\.\w+$").wrapper_object()
+        combo = dlg.child_window(class_name="ComboBox", title_re=_FILE_NAME_RE).wrapper_object()
         edit = combo.child_window(class_name="Edit").wrapper_object()
 
-    # Eingabe
-    edit.set_focus()
+    # Eingabe: ein WM_SETTEXT statt einer Tastatureingabe je Zeichen. Die Zwischenablage
+    # bleibt unangetastet (dort liegt evtl. ein gerade kopierter Dateiname).
     try:
-        edit.set_edit_text("")  # schneller als ^a{BACKSPACE}
+        edit.set_edit_text(path)
     except Exception:
-        pass
-    edit.type_keys(path, with_spaces=True, set_foreground=True)
+        edit.set_focus()
+        edit.type_keys(path, with_spaces=True, set_foreground=True)
 
     # 2) Speichern klicken (deutsch/englisch)
     try:
-        btn = (dlg.child_window(title_re=r"^S&?peichern$", class_name="Button")
+        btn = (dlg.child_window(title_re=_SAVE_BUTTON_DE_RE, class_name="Button")
                   .wrapper_object())
     except Exception:
         try:
-            btn = dlg.child_window(title_re=r"^Save$", class_name="Button").wrapper_object()
+            btn = dlg.child_window(title_re=_SAVE_BUTTON_EN_RE, class_name="Button").wrapper_object()
         except Exception:
             btn = None
 
@@ -0,0 +1,29 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import main  # noqa: E402
+
+
+class FieldConfigTest(unittest.TestCase):
+    def test_derived_fields_without_parser(self):
+        config = main.FieldConfig(field_id="anzahl", label="Anzahl", kind="integer")
+
+        self.assertEqual(config.coerce("12"), (12, True))
+        self.assertEqual(config.display_label, "Anzahl:")
+        self.assertFalse(config.is_date_auto)
+
+    def test_parsed_and_direct_config_match(self):
+        parsed = main._parse_field_config({"id": "mess_tag", "label": "Mess-Tag:", "type": "float"})
+        direct = main.FieldConfig(field_id="mess_tag", label="Mess-Tag:", kind="float")
+
+        self.assertEqual(parsed, direct)
+        self.assertIs(parsed.coerce, direct.coerce)
+        self.assertEqual(direct.display_label, "Mess-Tag:")
+        self.assertTrue(direct.is_date_auto)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import main  # noqa: E402
+
+
+class _StubWidget:
+    def __init__(self, *args, **kwargs):
+        self.text = ""
+
+    def grid_remove(self):
+        pass
+
+    def lift(self):
+        pass
+
+    def configure(self, **kwargs):
+        self.text = kwargs.get("text", self.text)
+
+
+class _StubControl:
+    """Ersetzt FieldControl ohne Tk-Widgets; hält nur Konfiguration und Wert."""
+
+    def __init__(self, config):
+        self.config = config
+        self.widget = _StubWidget()
+        self.value = ""
+
+    def get_value(self):
+        return self.value
+
+    def set_value(self, value):
+        self.value = value
+
+    def reset(self, config):
+        self.config = config
+        self.value = ""
+
+    def bind_on_change(self, callback):
+        pass
+
+
+def _field(field_id):
+    return main.FieldConfig(field_id=field_id, label=field_id)
+
+
+class FieldRowPoolTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(main.ttk, "Label", _StubWidget)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = main.FieldRowPool(None, lambda parent, config: _StubControl(config), keep_values=True)
+
+    def _build(self, field_ids):
+        configs = [_field(field_id) for field_id in field_ids]
+        self.pool.release_all(configs)
+        return {config.field_id: self.pool.acquire(config) for config in configs}
+
+    def test_reload_with_new_field_before_kept_one(self):
+        rows = self._build(["a", "b"])
+        rows["b"].control.set_value("wert b")
+
+        reloaded = self._build(["c", "b"])
+
+        self.assertIs(reloaded["b"], rows["b"])
+        self.assertEqual(reloaded["b"].control.get_value(), "wert b")
+        self.assertIs(reloaded["c"], rows["a"])
+        self.assertEqual(reloaded["c"].control.get_value(), "")
+
+    def test_kept_row_not_given_to_new_field(self):
+        rows = self._build(["a"])
+        rows["a"].control.set_value("wert a")
+
+        reloaded = self._build(["c", "a"])
+
+        self.assertIs(reloaded["a"], rows["a"])
+        self.assertEqual(reloaded["a"].control.get_value(), "wert a")
+        self.assertIsNot(reloaded["c"], rows["a"])
+
+    def test_dropped_field_row_is_reused(self):
+        rows = self._build(["a", "b"])
+        rows["a"].control.set_value("wert a")
+
+        reloaded = self._build(["b"])
+        again = self._build(["c", "a"])
+
+        self.assertIs(reloaded["b"], rows["b"])
+        self.assertEqual(again["a"].control.get_value(), "")
+        self.assertEqual(len(self.pool.rows), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "resources"))
+
+# Die Suchlogik braucht kein echtes pywinauto; ohne Windows reicht ein leeres Modul für den Import
+if "pywinauto" not in sys.modules:
+    try:
+        import pywinauto  # noqa: F401
+    except ImportError:
+        sys.modules["pywinauto"] = types.SimpleNamespace(Desktop=None)
+
+import get_save_dialog  # noqa: E402
+
+
+class _StubWindow:
+    def __init__(self, handle, visible=True, parent=None):
+        self.handle = handle
+        self._visible = visible
+        self._parent = parent
+
+    def is_visible(self):
+        return self._visible
+
+    def top_level_parent(self):
+        return self._parent
+
+
+class _StubDesktop:
+    def __init__(self, name):
+        self.name = name
+
+    def window(self, handle):
+        return (self.name, handle)
+
+
+class _NoWait:
+    def wait(self, timeout):
+        pass
+
+
+class WaitAndFillTest(unittest.TestCase):
+    def setUp(self):
+        self.filled = []
+        self.windows = {"win32": [], "uia": []}
+        self.hwnd = None
+        self.api = None
+        self.desktops = {name: _StubDesktop(name) for name in ("uia", "win32")}
+        for name, value in {
+            "_find_dialog_hwnd": lambda pid: self.hwnd,
+            "_win32_api": lambda: self.api,
+            "_process_windows": lambda desktop, pid: self.windows[desktop.name],
+            "_fill_and_save_win32": lambda dlg, path: self.filled.append(dlg) or True,
+            "UIA_FALLBACK_DELAY": 0,
+        }.items():
+            patcher = mock.patch.object(get_save_dialog, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run(self):
+        with mock.patch("builtins.print"):
+            return get_save_dialog._wait_and_fill(self.desktops, _NoWait(), 1234, "C:/x.otb4", 0.05)
+
+    def test_probe_hit(self):
+        self.hwnd = 7
+        self.assertTrue(self._run())
+        self.assertEqual(self.filled, [("win32", 7)])
+
+    def test_uia_class_hit(self):
+        self.api = object()  # win32 übernimmt dann die Probe, die Aufzählung nur noch UIA
+        self.windows["win32"] = [(_StubWindow(6), "#32770", "", "Speichern unter")]
+        self.windows["uia"] = [(_StubWindow(8), "#32770", "Window", "Speichern unter")]
+        self.assertTrue(self._run())
+        self.assertEqual(self.filled, [("uia", 8)])
+
+    def test_win32_class_hit_without_api(self):
+        self.windows["win32"] = [(_StubWindow(6, visible=False), "#32770", "", ""), (_StubWindow(5), "#32770", "", "")]
+        self.assertTrue(self._run())
+        self.assertEqual(self.filled, [("win32", 5)])
+
+    def test_cfd_parent_hit(self):
+        self.windows["win32"] = [(_StubWindow(9, parent=_StubWindow(10)), "Static", "", "CFD File 1 Window")]
+        self.assertTrue(self._run())
+        self.assertEqual(self.filled, [("win32", 10)])
+
+    def test_uia_title_hit(self):
+        self.windows["uia"] = [(_StubWindow(11), "Foo", "Window", "Speichern unter")]
+        self.assertTrue(self._run())
+        self.assertEqual(self.filled, [("win32", 11)])
+
+    def test_uia_title_ignores_hidden_window(self):
+        self.windows["uia"] = [(_StubWindow(11, visible=False), "Foo", "Window", "Speichern unter")]
+        self.assertFalse(self._run())
+        self.assertEqual(self.filled, [])
+
+    def test_uia_waits_for_fallback_delay(self):
+        self.windows["uia"] = [(_StubWindow(11), "Foo", "Window", "Speichern unter")]
+        with mock.patch.object(get_save_dialog, "UIA_FALLBACK_DELAY", 60):
+            self.assertFalse(self._run())
+        self.assertEqual(self.filled, [])
+
+
+class _FakeUser32:
+    """Top-Level-Fenster als {hwnd: (pid, sichtbar, Titel, Klassen der Kindfenster)}."""
+
+    def __init__(self, windows):
+        self.windows = windows
+
+    def FindWindowExW(self, parent, after, class_name, title):
+        handles = list(self.windows)
+        start = handles.index(after) + 1 if after else 0
+        return handles[start] if start < len(handles) else None
+
+    def GetWindowThreadProcessId(self, hwnd, process_id_ref):
+        process_id_ref._obj.value = self.windows[hwnd][0]
+
+    def IsWindowVisible(self, hwnd):
+        return self.windows[hwnd][1]
+
+    def GetWindowTextW(self, hwnd, buffer, size):
+        buffer.value = self.windows[hwnd][2]
+
+    def EnumChildWindows(self, hwnd, callback, lparam):
+        for index, _class_name in enumerate(self.windows[hwnd][3]):
+            if not callback((hwnd, index), lparam):
+                break
+
+    def GetClassNameW(self, child, buffer, size):
+        hwnd, index = child
+        buffer.value = self.windows[hwnd][3][index]
+
+
+class FindDialogHwndTest(unittest.TestCase):
+    def _find(self, windows):
+        from ctypes import wintypes
+
+        api = (_FakeUser32(windows), wintypes, None, lambda callback: callback)
+        with mock.patch.object(get_save_dialog, "_win32_api", lambda: api):
+            return get_save_dialog._find_dialog_hwnd(1234)
+
+    def test_message_box_is_skipped(self):
+        windows = {
+            1: (1234, True, "OTBioLab", ["Static", "Button"]),
+            2: (1234, True, "Speichern unter", ["DUIViewWndClassName"]),
+        }
+        self.assertEqual(self._find(windows), 2)
+
+    def test_dialog_with_file_name_edit(self):
+        windows = {
+            1: (1234, True, "OTBioLab", ["Static", "Button"]),
+            2: (1234, True, "", ["ComboBoxEx32", "ComboBox", "Edit"]),
+        }
+        self.assertEqual(self._find(windows), 2)
+
+    def test_other_process_and_hidden_dialogs_are_skipped(self):
+        windows = {
+            1: (99, True, "Speichern unter", []),
+            2: (1234, False, "Speichern unter", []),
+        }
+        self.assertIsNone(self._find(windows))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import sys
+import types
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import main  # noqa: E402
+
+
+def _result():
+    return main.StepResult(
+        config=main.StepConfig(step_id="s1", title="Schritt 1"),
+        started_at_ns=0,
+        completed_at_ns=1,
+        duration_ns=1,
+        values={"kraft": 1.5},
+        notes="",
+        otbiolab_paths=["a.otb4"],
+        field_otbiolab_files={"mvc": ["mvc_1.otb4"]},
+        repeated_measurements={"mvc": [{"kraft": "10", "otbiolab_file": "mvc_1.otb4"}]},
+    )
+
+
+class RevisitStepStateTest(unittest.TestCase):
+    def test_editing_revisited_step_leaves_result_unchanged(self):
+        result = _result()
+        app = types.SimpleNamespace(step_results=[result], current_step_index=0)
+
+        main.SessionApp._load_step_state(app)  # wie _back_to_previous_step
+        state = app.step_state
+        state.otbiolab_paths.append("b.otb4")
+        state.field_otbiolab_files["mvc"].append("mvc_2.otb4")
+        state.field_otbiolab_files["neu"] = ["neu_1.otb4"]
+        state.repeated_measurements["mvc"][0]["kraft"] = "99"
+        state.repeated_measurements["mvc"].append({"kraft": "11"})
+
+        self.assertEqual(result, _result())
+
+    def test_step_without_result_starts_empty(self):
+        app = types.SimpleNamespace(step_results=[None], current_step_index=0)
+
+        main.SessionApp._load_step_state(app)
+
+        self.assertTrue(app.step_state.is_empty())
+
+
+if __name__ == "__main__":
+    unittest.main()